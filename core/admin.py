@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, UserProfile, MoodEntry, Organization, OrganizationStaff, PatientCase, OrganizationAppointment, OrganizationAlert
+from .models import User, UserProfile, MoodEntry, MoodDailyRollup, MoodStreak, UserMoodRisk, PlatformStatsSnapshot, Organization, OrganizationStaff, PatientCase, OrganizationAppointment, OrganizationAlert
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -60,6 +60,35 @@ class MoodEntryAdmin(admin.ModelAdmin):
     search_fields = ['user__username']
     ordering = ['-date']
 
+@admin.register(MoodDailyRollup)
+class MoodDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'day', 'entry_count', 'mood_min', 'mood_max', 'updated_at']
+    list_filter = ['day']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
+    date_hierarchy = 'day'
+
+@admin.register(MoodStreak)
+class MoodStreakAdmin(admin.ModelAdmin):
+    list_display = ['user', 'current_streak', 'longest_streak', 'last_logged_date', 'updated_at']
+    search_fields = ['user__username']
+    ordering = ['-current_streak']
+    readonly_fields = ['updated_at']
+
+@admin.register(UserMoodRisk)
+class UserMoodRiskAdmin(admin.ModelAdmin):
+    list_display = ['user', 'risk_score', 'needs_attention', 'avg_7d', 'avg_30d', 'slope_30d', 'last_entry_date', 'computed_at']
+    list_filter = ['needs_attention']
+    search_fields = ['user__username']
+    ordering = ['-risk_score']
+    readonly_fields = ['computed_at']
+
+@admin.register(PlatformStatsSnapshot)
+class PlatformStatsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['computed_at', 'computation_ms']
+    ordering = ['-computed_at']
+    readonly_fields = ['stats', 'computed_at', 'computation_ms']
+
 class OrganizationUserInline(admin.StackedInline):
     """Inline to create user account when creating organization"""
     model = User
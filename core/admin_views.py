@@ -3,19 +3,20 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView, ListView, DetailView
 from django.contrib import messages
-from django.db.models import Count, Avg, Q
-from django.utils import timezone
+from django.db.models import Q
 from django.http import JsonResponse
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
-from datetime import timedelta
+from datetime import date
 <<<<<<< HEAD
 =======
 from django.contrib.sessions.models import Session
 from django.conf import settings
 >>>>>>> test
 from .models import User, MoodEntry, Organization, OrganizationStaff
+from .platform_stats import latest_snapshot, refresh_platform_stats
 from .forms import AdminOrganizationCreationForm, AdminUserEditForm, AdminUserCreateForm, AdminOrganizationEditForm
 from screening.models import Assessment, Question, AnswerChoice, UserAssessment
 from screening.forms import AssessmentForm, QuestionForm, AnswerChoiceForm
@@ -39,34 +40,30 @@ class AdminDashboardView(LoginRequiredMixin, AdminRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        snapshot = latest_snapshot()
+        stats = snapshot.stats
+        context['stats_snapshot'] = snapshot
+        
         # User statistics
-        context['total_users'] = User.objects.count()
-        context['regular_users'] = User.objects.filter(role='user').count()
-<<<<<<< HEAD
-        context['organizations'] = User.objects.filter(role='organization').count()
-=======
+        context['total_users'] = stats['total_users']
+        context['regular_users'] = stats['regular_users']
         # Count actual Organization records, not just users with organization role
-        context['organizations'] = Organization.objects.count()
->>>>>>> test
-        context['verified_organizations'] = Organization.objects.filter(is_verified=True).count()
-        context['unverified_organizations'] = Organization.objects.filter(is_verified=False).count()
+        context['organizations'] = stats['total_organizations']
+        context['verified_organizations'] = stats['verified_organizations']
+        context['unverified_organizations'] = stats['unverified_organizations']
         
         # Recent registrations (last 30 days)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        context['recent_users'] = User.objects.filter(created_at__gte=thirty_days_ago).count()
+        context['recent_users'] = stats['recent_users']
         
         # Assessment statistics
-        from screening.models import UserAssessment, AssessmentResult
+        from screening.models import AssessmentResult
         
-        context['total_assessments'] = UserAssessment.objects.filter(is_completed=True).count()
-        context['recent_assessments'] = UserAssessment.objects.filter(
-            is_completed=True,
-            completed_at__gte=thirty_days_ago
-        ).count()
+        context['total_assessments'] = stats['total_assessments']
+        context['recent_assessments'] = stats['recent_assessments']
         
         # Mood entries
-        context['total_mood_entries'] = MoodEntry.objects.count()
-        context['recent_mood_entries'] = MoodEntry.objects.filter(date__gte=thirty_days_ago).count()
+        context['total_mood_entries'] = stats['total_mood_entries']
+        context['recent_mood_entries'] = stats['recent_mood_entries']
         
         # Critical cases that need attention
         severe_results = AssessmentResult.objects.filter(
@@ -74,18 +71,10 @@ class AdminDashboardView(LoginRequiredMixin, AdminRequiredMixin, TemplateView):
         ).order_by('-created_at')[:10]
         context['severe_cases'] = severe_results
         
-        # Monthly user registration trends
-        monthly_users = {}
-        for i in range(12):
-            month_start = timezone.now() - timedelta(days=30*i)
-            month_end = timezone.now() - timedelta(days=30*(i-1)) if i > 0 else timezone.now()
-            count = User.objects.filter(
-                created_at__gte=month_start,
-                created_at__lt=month_end
-            ).count()
-            monthly_users[month_start.strftime('%Y-%m')] = count
-        
-        context['monthly_users'] = monthly_users
+        # Monthly user registration trends, newest month first
+        context['monthly_users'] = {
+            month[:7]: count for month, count in reversed(stats['monthly_users'])
+        }
         
         return context
 
@@ -216,71 +205,52 @@ class AdminOrganizationDetailView(LoginRequiredMixin, AdminRequiredMixin, Detail
 @user_passes_test(is_admin)
 def admin_analytics_view(request):
     """Admin analytics view with detailed statistics"""
-    from screening.models import UserAssessment, AssessmentResult
     from collections import OrderedDict
     
     context = {}
     
-    # User analytics
-    context['total_users'] = User.objects.count()
-    context['active_users'] = User.objects.filter(is_active=True).count()
-    context['regular_users'] = User.objects.filter(role='user').count()
-<<<<<<< HEAD
-    context['organizations'] = User.objects.filter(role='organization').count()
+    snapshot = latest_snapshot()
+    stats = snapshot.stats
+    context['stats_snapshot'] = snapshot
     
-    # Total organizations (Organization model)
-=======
+    # User analytics
+    context['total_users'] = stats['total_users']
+    context['active_users'] = stats['active_users']
+    context['regular_users'] = stats['regular_users']
     
     # Count actual Organization records, not just users with organization role
-    context['organizations'] = Organization.objects.count()
->>>>>>> test
-    context['total_organizations'] = Organization.objects.count()
+    context['organizations'] = stats['total_organizations']
+    context['total_organizations'] = stats['total_organizations']
     
     # Assessment analytics
-    context['total_assessments'] = UserAssessment.objects.filter(is_completed=True).count()
-    
-    # Assessment type breakdown (for template: assessment_types)
-    assessment_types = UserAssessment.objects.filter(is_completed=True).values(
-        'assessment__name'
-    ).annotate(count=Count('id')).order_by('-count')
-    context['assessment_types'] = {item['assessment__name']: item['count'] for item in assessment_types}
-    
-    # Severity level distribution
-    severity_distribution = AssessmentResult.objects.values('severity_level').annotate(
-        count=Count('id')
-    ).order_by('severity_level')
-    context['severity_distribution'] = {item['severity_level']: item['count'] for item in severity_distribution}
-    
-    # Organization types breakdown
-    org_types = Organization.objects.values('organization_type').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    context['org_types'] = {item['organization_type']: item['count'] for item in org_types}
+    context['total_assessments'] = stats['total_assessments']
+    context['assessment_types'] = dict(stats['assessment_types'])
+    context['severity_distribution'] = dict(stats['severity_distribution'])
+    context['org_types'] = dict(stats['org_types'])
     
     # Monthly user growth (last 12 months)
-    monthly_users = OrderedDict()
-    for i in range(11, -1, -1):  # Start from 11 months ago to now
-        month_start = timezone.now() - timedelta(days=30*(i+1))
-        month_end = timezone.now() - timedelta(days=30*i)
-        
-        # Use created_at field from custom User model
-        users_count = User.objects.filter(
-            created_at__gte=month_start,
-            created_at__lt=month_end
-        ).count()
-        
-        month_key = month_start.strftime('%b')  # Short month name
-        monthly_users[month_key] = users_count
-    
-    context['monthly_users'] = monthly_users
+    context['monthly_users'] = OrderedDict(
+        (date.fromisoformat(month).strftime('%b'), count) for month, count in stats['monthly_users']
+    )
     
     # Mood analytics
-    context['total_mood_entries'] = MoodEntry.objects.count()
-    avg_mood = MoodEntry.objects.aggregate(avg_mood=Avg('mood'))['avg_mood']
-    context['average_mood'] = round(avg_mood, 2) if avg_mood else 0
+    context['total_mood_entries'] = stats['total_mood_entries']
+    context['average_mood'] = stats['average_mood']
     
     return render(request, 'core/admin_analytics.html', context)
 
+@login_required
+@user_passes_test(is_admin)
+@require_http_methods(["POST"])
+def admin_refresh_platform_stats(request):
+    """Recompute the platform stats snapshot now instead of waiting for the scheduled refresh"""
+    snapshot = refresh_platform_stats()
+    messages.success(request, f'Platform statistics refreshed in {snapshot.computation_ms:.0f} ms.')
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('core:admin_dashboard')
+
 @login_required
 @user_passes_test(is_admin)
 @require_http_methods(["POST"])
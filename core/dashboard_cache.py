@@ -0,0 +1,78 @@
+"""
+Dashboard Summary Cache
+Per-user dashboard figures kept in Django's cache and invalidated when mood or assessment data changes
+"""
+from datetime import timedelta
+from typing import NamedTuple
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import MoodDailyRollup, MoodEntry
+from .mood_cache import seconds_until_local_midnight
+from .mood_rollups import rollup_totals
+
+
+class DashboardSummary(NamedTuple):
+    recent_moods: tuple
+    mood_avg_week: float
+    assessments_taken: int
+    recent_assessment: object
+    phq9_count: int
+    gad7_count: int
+    pss_count: int
+    latest_results: tuple
+
+    @property
+    def needs_attention(self):
+        return any(
+            result.severity_level in ['moderately_severe', 'severe']
+            for result in self.latest_results
+        )
+
+
+def dashboard_key(user_id, day):
+    # The weekly average depends on the day, so each day gets its own entry
+    return f'dashboard_summary:{user_id}:{day.isoformat()}'
+
+
+def build_dashboard_summary(user):
+    """Compute the dashboard figures with five queries"""
+    from screening.models import UserAssessment, AssessmentResult
+
+    week_ago = timezone.localdate() - timedelta(days=7)
+    completed = UserAssessment.objects.filter(user=user, is_completed=True)
+    counts = completed.aggregate(
+        total=Count('id'),
+        phq9=Count('id', filter=Q(assessment__name='phq9')),
+        gad7=Count('id', filter=Q(assessment__name='gad7')),
+        pss=Count('id', filter=Q(assessment__name='pss')),
+    )
+    return DashboardSummary(
+        recent_moods=tuple(MoodEntry.objects.filter(user=user)[:7]),
+        mood_avg_week=rollup_totals(MoodDailyRollup.objects.filter(user=user, day__gte=week_ago))[1],
+        assessments_taken=counts['total'],
+        recent_assessment=completed.select_related('assessment').first(),
+        phq9_count=counts['phq9'],
+        gad7_count=counts['gad7'],
+        pss_count=counts['pss'],
+        latest_results=tuple(AssessmentResult.objects.filter(
+            user_assessment__user=user,
+            user_assessment__is_completed=True
+        ).order_by('-created_at')[:3]),
+    )
+
+
+def get_dashboard_summary(user):
+    """Serve the summary from the cache, rebuilding it on a miss"""
+    key = dashboard_key(user.pk, timezone.localdate())
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_dashboard_summary(user)
+        cache.set(key, summary, seconds_until_local_midnight())
+    return summary
+
+
+def invalidate_dashboards(user_ids):
+    """Drop today's cached summary for each user so the next visit rebuilds it"""
+    today = timezone.localdate()
+    cache.delete_many([dashboard_key(user_id, today) for user_id in set(user_ids) if user_id is not None])
@@ -286,9 +286,8 @@ def admin_review_comment_report(request, report_id):
 def admin_all_posts(request):
     """View all forum posts for admin"""
     posts = ForumPost.objects.select_related('author').prefetch_related(
-        'likes', 'comments', 'reports'
+        'comments', 'reports'
     ).annotate(
-        like_count=Count('likes', distinct=True),
         comment_count=Count('comments', distinct=True),
         report_count=Count('reports', distinct=True)
     ).order_by('-created_at')
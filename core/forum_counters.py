@@ -0,0 +1,51 @@
+"""
+Forum Counters
+Keeps ForumPost.like_count and visible_comment_count in step with likes and comments
+"""
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from .forum_models import ForumComment, ForumLike, ForumPost
+
+
+def adjust_post_counts(post_id, likes=0, comments=0):
+    """Apply counter deltas in a single UPDATE so concurrent writers never lose increments"""
+    changes = {}
+    if likes:
+        changes['like_count'] = Greatest(F('like_count') + likes, 0)
+    if comments:
+        changes['visible_comment_count'] = Greatest(F('visible_comment_count') + comments, 0)
+    if changes:
+        ForumPost.objects.filter(id=post_id).update(**changes)
+
+
+def reconcile_post_counts(batch_size=1000):
+    """
+    Recount likes and visible comments for every post and fix drifted counters.
+
+    Posts are walked in id order, with two grouped counts per batch. Returns
+    the number of posts whose counters were corrected.
+    """
+    corrected = 0
+    last_id = 0
+    while True:
+        posts = list(ForumPost.objects.filter(id__gt=last_id).order_by('id').values_list(
+            'id', 'like_count', 'visible_comment_count'
+        )[:batch_size])
+        if not posts:
+            return corrected
+        post_ids = [post_id for post_id, _, _ in posts]
+        likes = dict(ForumLike.objects.filter(post_id__in=post_ids).values_list(
+            'post_id'
+        ).annotate(count=Count('id')).order_by())
+        comments = dict(ForumComment.objects.filter(post_id__in=post_ids, is_hidden=False).values_list(
+            'post_id'
+        ).annotate(count=Count('id')).order_by())
+
+        stale = [
+            ForumPost(id=post_id, like_count=likes.get(post_id, 0), visible_comment_count=comments.get(post_id, 0))
+            for post_id, like_count, comment_count in posts
+            if (like_count, comment_count) != (likes.get(post_id, 0), comments.get(post_id, 0))
+        ]
+        ForumPost.objects.bulk_update(stale, ['like_count', 'visible_comment_count'])
+        corrected += len(stale)
+        last_id = post_ids[-1]
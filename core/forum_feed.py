@@ -0,0 +1,93 @@
+"""
+Forum Feed
+Keyset (cursor) pagination over forum posts ordered by (created_at, id)
+"""
+import base64
+from django.db.models import F, Prefetch, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.dateparse import parse_datetime
+from .forum_models import ForumComment, ForumLike, ForumPost
+
+FEED_PAGE_SIZE = 20
+COMMENT_PREVIEW_SIZE = 3
+
+
+def latest_comments_prefetch(size=COMMENT_PREVIEW_SIZE):
+    """
+    Prefetch at most ``size`` latest visible comments per post into ``latest_comments``.
+
+    Comments are ranked with ROW_NUMBER() partitioned by post, so the
+    prefetch loads page size x ``size`` rows however long a thread is.
+    The preview is in chronological order.
+    """
+    ranked = ForumComment.objects.filter(is_hidden=False).select_related('author').annotate(
+        preview_rank=Window(
+            RowNumber(),
+            partition_by=F('post_id'),
+            order_by=(F('created_at').desc(), F('id').desc()),
+        )
+    ).filter(preview_rank__lte=size).order_by('created_at', 'id')
+    return Prefetch('comments', queryset=ranked, to_attr='latest_comments')
+
+
+def feed_posts():
+    """Visible posts with their authors and comment previews; counts are stored on the post"""
+    return ForumPost.objects.filter(is_hidden=False).select_related('author').prefetch_related(
+        latest_comments_prefetch()
+    )
+
+
+class InvalidCursor(ValueError):
+    """A feed cursor token could not be decoded"""
+
+
+def encode_cursor(post):
+    """Opaque token pointing just past ``post`` in feed order"""
+    raw = f'{post.created_at.isoformat()}|{post.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return the (created_at, id) position encoded in a token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        created_at, post_id = raw.rsplit('|', 1)
+        position = parse_datetime(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor(f'Invalid feed cursor: {token!r}')
+    if position[0] is None:
+        raise InvalidCursor(f'Invalid feed cursor: {token!r}')
+    return position
+
+
+def attach_liked(posts, user):
+    """Set ``is_liked`` on each post from one query for the viewer's likes among them"""
+    liked = set()
+    if posts and user.is_authenticated:
+        liked = set(ForumLike.objects.filter(
+            user=user, post_id__in=[post.id for post in posts]
+        ).values_list('post_id', flat=True))
+    for post in posts:
+        post.is_liked = post.id in liked
+    return posts
+
+
+def feed_page(queryset=None, cursor=None, limit=FEED_PAGE_SIZE, viewer=None):
+    """
+    One page of posts, newest first, and the cursor for the next page.
+
+    Seeks past the cursor position instead of using OFFSET, so every page
+    is a range scan on the created_at index however deep the reader is,
+    and no total count is needed. ``next_cursor`` is None on the last page.
+    With a ``viewer``, each post also gets ``is_liked``.
+    """
+    posts = (feed_posts() if queryset is None else queryset).order_by('-created_at', '-id')
+    if cursor:
+        created_at, post_id = decode_cursor(cursor)
+        posts = posts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+    page = list(posts[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    page = page[:limit]
+    if viewer is not None:
+        attach_liked(page, viewer)
+    return page, next_cursor
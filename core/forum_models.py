@@ -24,6 +24,11 @@ class ForumPost(models.Model):
     is_edited = models.BooleanField(default=False)
     is_flagged = models.BooleanField(default=False, help_text="Post has been reported")
     is_hidden = models.BooleanField(default=False, help_text="Hidden by admin")
+    # Denormalized counters kept in step by core.forum_counters; see reconcile_forum_counts
+    like_count = models.PositiveIntegerField(default=0)
+    visible_comment_count = models.PositiveIntegerField(default=0)
+    
+    COUNTER_FIELDS = ('like_count', 'visible_comment_count')
     
     class Meta:
         ordering = ['-created_at']
@@ -37,11 +42,15 @@ class ForumPost(models.Model):
         content_preview = self.content[:50] if self.content else "[Image Post]"
         return f"{self.author.username} - {content_preview}"
     
-    def like_count(self):
-        return self.likes.count()
-    
-    def comment_count(self):
-        return self.comments.filter(is_hidden=False).count()
+    def save(self, *args, **kwargs):
+        # Counters only change through atomic F() updates; writing back the loaded
+        # values would undo any like or comment counted since this instance was read
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
     
     def report_count(self):
         return self.reports.count()
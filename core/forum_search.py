@@ -0,0 +1,251 @@
+"""
+Forum Search
+Full-text index over visible forum posts and comments: SQLite FTS5 or a PostgreSQL tsvector table
+"""
+import re
+from django.db import connection
+from django.db.models import Q
+from .forum_feed import feed_posts
+from .forum_models import ForumComment, ForumPost
+
+SEARCH_TABLE = 'core_forum_search'
+REBUILD_BATCH_SIZE = 1000
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def document_id(kind, object_id):
+    """Posts and comments share one table; the kind is folded into the row id"""
+    return object_id * 2 + (1 if kind == 'comment' else 0)
+
+
+def search_terms(query):
+    return TOKEN_RE.findall(query or '')
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table ranked by bm25 (its default rank); lower scores are better matches"""
+
+    def create_table(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            f"USING fts5(content, post_id UNINDEXED, tokenize = 'porter unicode61')"
+        )
+
+    def drop_table(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def upsert(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, post_id, content) VALUES (%s, %s, %s)', rows
+        )
+
+    def delete(self, cursor, doc_ids):
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(doc_id,) for doc_id in doc_ids])
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def match_expression(self, terms):
+        # Quote every term so user input is never parsed as FTS5 query syntax
+        return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+    def count(self, cursor, terms):
+        cursor.execute(
+            f'SELECT COUNT(DISTINCT post_id) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+            [self.match_expression(terms)],
+        )
+        return cursor.fetchone()[0]
+
+    def ranked_post_ids(self, cursor, terms, limit, offset):
+        cursor.execute(
+            # The rank column is bm25() and, unlike the function, may be aggregated
+            f'SELECT post_id, MIN(rank) AS score FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s GROUP BY post_id ORDER BY score, post_id DESC LIMIT %s OFFSET %s',
+            [self.match_expression(terms), limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend:
+    """Table of tsvector documents with a GIN index, ranked with ts_rank()"""
+
+    config = 'english'
+
+    def create_table(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            f'id bigint PRIMARY KEY, post_id bigint NOT NULL, document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)')
+
+    def drop_table(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def upsert(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (id, post_id, document) VALUES (%s, %s, to_tsvector(%s, %s)) '
+            f'ON CONFLICT (id) DO UPDATE SET post_id = EXCLUDED.post_id, document = EXCLUDED.document',
+            [(doc_id, post_id, self.config, content) for doc_id, post_id, content in rows],
+        )
+
+    def delete(self, cursor, doc_ids):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE id = ANY(%s)', [list(doc_ids)])
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def count(self, cursor, terms):
+        cursor.execute(
+            f'SELECT COUNT(DISTINCT post_id) FROM {SEARCH_TABLE} WHERE document @@ plainto_tsquery(%s, %s)',
+            [self.config, ' '.join(terms)],
+        )
+        return cursor.fetchone()[0]
+
+    def ranked_post_ids(self, cursor, terms, limit, offset):
+        cursor.execute(
+            f'SELECT post_id, MAX(ts_rank(document, query)) AS score '
+            f'FROM {SEARCH_TABLE}, plainto_tsquery(%s, %s) AS query WHERE document @@ query '
+            f'GROUP BY post_id ORDER BY score DESC, post_id DESC LIMIT %s OFFSET %s',
+            [self.config, ' '.join(terms), limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_backend():
+    """Index backend for the configured database; None means search falls back to a scan"""
+    backend = BACKENDS.get(connection.vendor)
+    return backend() if backend else None
+
+
+# Index maintenance
+
+def index_post(post):
+    """Add or refresh a post's document; hidden posts are removed along with their comments"""
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        if post.is_hidden:
+            comment_ids = ForumComment.objects.filter(post_id=post.id).values_list('id', flat=True)
+            backend.delete(cursor, [document_id('post', post.id)] + [document_id('comment', c) for c in comment_ids])
+        else:
+            backend.upsert(cursor, [(document_id('post', post.id), post.id, post.content)])
+
+
+def index_post_comments(post_id):
+    """Re-add every visible comment of a post, e.g. after the post is unhidden"""
+    backend = get_backend()
+    if backend is None:
+        return
+    comments = ForumComment.objects.filter(post_id=post_id, is_hidden=False).values_list('id', 'content')
+    with connection.cursor() as cursor:
+        backend.upsert(cursor, [(document_id('comment', c_id), post_id, content) for c_id, content in comments])
+
+
+def index_comment(comment, post_hidden=False):
+    """Add or refresh a comment's document; hidden comments and comments on hidden posts are removed"""
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        if comment.is_hidden or post_hidden:
+            backend.delete(cursor, [document_id('comment', comment.id)])
+        else:
+            backend.upsert(cursor, [(document_id('comment', comment.id), comment.post_id, comment.content)])
+
+
+def unindex(kind, object_id):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.delete(cursor, [document_id(kind, object_id)])
+
+
+def rebuild_index(batch_size=REBUILD_BATCH_SIZE):
+    """Recreate the index from visible posts and their visible comments; returns documents indexed"""
+    backend = get_backend()
+    if backend is None:
+        return 0
+    with connection.cursor() as cursor:
+        backend.create_table(cursor)
+        backend.clear(cursor)
+
+    indexed = 0
+    sources = (
+        ('post', ForumPost.objects.filter(is_hidden=False).values_list('id', 'id', 'content')),
+        ('comment', ForumComment.objects.filter(is_hidden=False, post__is_hidden=False).values_list(
+            'id', 'post_id', 'content'
+        )),
+    )
+    for kind, rows in sources:
+        batch = []
+        for object_id, post_id, content in rows.order_by('id').iterator(chunk_size=batch_size):
+            batch.append((document_id(kind, object_id), post_id, content))
+            if len(batch) >= batch_size:
+                indexed += write_batch(backend, batch)
+                batch = []
+        indexed += write_batch(backend, batch)
+    return indexed
+
+
+def write_batch(backend, rows):
+    if rows:
+        with connection.cursor() as cursor:
+            backend.upsert(cursor, rows)
+    return len(rows)
+
+
+# Querying
+
+class SearchResults:
+    """
+    Lazily evaluated, ranked search results usable with Django's Paginator.
+
+    Each page costs one ranked id query plus the feed queries loading those
+    posts; ``count()`` is a separate query run once by the paginator.
+    """
+
+    def __init__(self, query):
+        self.terms = search_terms(query)
+        self.backend = get_backend()
+
+    def count(self):
+        if not self.terms:
+            return 0
+        if self.backend is None:
+            return self.fallback_queryset().count()
+        with connection.cursor() as cursor:
+            return self.backend.count(cursor, self.terms)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        if not isinstance(page, slice):
+            raise TypeError('SearchResults only supports slicing')
+        if not self.terms:
+            return []
+        offset = page.start or 0
+        limit = page.stop - offset
+        if self.backend is None:
+            return list(self.fallback_queryset()[offset:offset + limit])
+        with connection.cursor() as cursor:
+            post_ids = self.backend.ranked_post_ids(cursor, self.terms, limit, offset)
+        posts = feed_posts().in_bulk(post_ids)
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+    def fallback_queryset(self):
+        """Unindexed scan for databases without a search backend"""
+        matches = Q()
+        for term in self.terms:
+            matches &= Q(content__icontains=term) | Q(
+                comments__content__icontains=term, comments__is_hidden=False
+            )
+        return feed_posts().filter(matches).distinct().order_by('-created_at', '-id')
@@ -4,12 +4,17 @@ Views for Forum/Community System
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import ListView, DetailView
+from django.views.generic import DetailView, TemplateView
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
+from django.core.paginator import Paginator
 from django.utils import timezone
-from django.db.models import Q, Count, Prefetch
+from django.db.models import Q, Prefetch
+from .forum_feed import InvalidCursor, attach_liked, feed_page
+from .forum_search import SearchResults
 from .forum_models import ForumPost, ForumComment, ForumLike, ForumReport, ForumCommentReport
 from .forum_forms import ForumPostForm, ForumCommentForm, ForumReportForm, ForumCommentReportForm
 from .feedback_models import Notification
@@ -18,30 +23,62 @@ from .models import User
 
 # Forum List & Post Views
 
-class ForumListView(LoginRequiredMixin, ListView):
-    """View all forum posts"""
-    model = ForumPost
+class ForumListView(LoginRequiredMixin, TemplateView):
+    """View forum posts, newest first, one cursor page at a time"""
     template_name = 'core/forum_list.html'
-    context_object_name = 'posts'
-    paginate_by = 20
-    
-    def get_queryset(self):
-        queryset = ForumPost.objects.filter(is_hidden=False).select_related('author').prefetch_related(
-            'likes',
-            Prefetch('comments', queryset=ForumComment.objects.filter(is_hidden=False).select_related('author'))
-        ).annotate(
-            like_count=Count('likes', distinct=True),
-            comment_count=Count('comments', filter=Q(comments__is_hidden=False), distinct=True)
-        )
-        return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        try:
+            posts, next_cursor = feed_page(cursor=self.request.GET.get('cursor'), viewer=self.request.user)
+        except InvalidCursor:
+            raise Http404('Invalid feed cursor')
+        context['posts'] = posts
+        context['next_cursor'] = next_cursor
         context['post_form'] = ForumPostForm()
-        context['total_posts'] = ForumPost.objects.filter(is_hidden=False).count()
         return context
 
 
+@login_required
+def forum_feed(request):
+    """JSON page of the forum feed for infinite scroll"""
+    try:
+        posts, next_cursor = feed_page(cursor=request.GET.get('cursor'), viewer=request.user)
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'posts': [
+            {
+                'id': post.id,
+                'created_at': post.created_at.isoformat(),
+                'like_count': post.like_count,
+                'is_liked': post.is_liked,
+                'comment_count': post.visible_comment_count,
+                'url': reverse('core:forum_post_detail', args=[post.id]),
+                'html': render_to_string('core/components/forum_post_card.html', {'post': post}, request=request),
+            }
+            for post in posts
+        ],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+def forum_search(request):
+    """Search visible posts and comments, best matches first"""
+    query = request.GET.get('q', '').strip()
+    page = Paginator(SearchResults(query), 20).get_page(request.GET.get('page'))
+    attach_liked(page.object_list, request.user)
+    
+    return render(request, 'core/forum_search.html', {
+        'query': query,
+        'page_obj': page,
+        'posts': page.object_list,
+    })
+
+
 class ForumPostDetailView(LoginRequiredMixin, DetailView):
     """View single post with comments"""
     model = ForumPost
@@ -51,7 +88,6 @@ class ForumPostDetailView(LoginRequiredMixin, DetailView):
     
     def get_queryset(self):
         return ForumPost.objects.filter(is_hidden=False).select_related('author').prefetch_related(
-            'likes',
             Prefetch('comments', queryset=ForumComment.objects.filter(is_hidden=False).select_related('author').order_by('created_at'))
         )
     
@@ -59,7 +95,7 @@ class ForumPostDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         context['comment_form'] = ForumCommentForm()
         context['report_form'] = ForumReportForm()
-        context['is_liked'] = self.object.is_liked_by(self.request.user)
+        context['is_liked'] = attach_liked([self.object], self.request.user)[0].is_liked
         return context
 
 
@@ -77,11 +113,11 @@ def create_post(request):
         else:
             messages.error(request, 'Please correct the errors below.')
             # Return to forum list with errors
-            posts = ForumPost.objects.filter(is_hidden=False).select_related('author').order_by('-created_at')[:20]
+            posts, next_cursor = feed_page(viewer=request.user)
             return render(request, 'core/forum_list.html', {
                 'posts': posts,
+                'next_cursor': next_cursor,
                 'post_form': form,
-                'total_posts': ForumPost.objects.filter(is_hidden=False).count()
             })
     
     return redirect('core:forum_list')
@@ -138,16 +174,14 @@ def toggle_like(request, post_id):
     """Like or unlike a post"""
     post = get_object_or_404(ForumPost, id=post_id, is_hidden=False)
     
-    # Check if already liked
-    existing_like = ForumLike.objects.filter(post=post, user=request.user).first()
+    # Unlike if already liked; the like signals keep post.like_count in step
+    unliked, _ = ForumLike.objects.filter(post=post, user=request.user).delete()
     
-    if existing_like:
-        # Unlike
-        existing_like.delete()
+    if unliked:
         liked = False
     else:
         # Like
-        ForumLike.objects.create(post=post, user=request.user)
+        ForumLike.objects.get_or_create(post=post, user=request.user)
         liked = True
         
         # Notify post author (if not liking own post)
@@ -160,10 +194,11 @@ def toggle_like(request, post_id):
                 link_url=f'/forum/post/{post.id}/'
             )
     
+    post.refresh_from_db(fields=['like_count'])
     return JsonResponse({
         'success': True,
         'liked': liked,
-        'like_count': post.like_count()
+        'like_count': post.like_count
     })
 
 
@@ -339,12 +374,7 @@ def report_comment(request, comment_id):
 @login_required
 def my_posts(request):
     """View user's own posts"""
-    posts = ForumPost.objects.filter(author=request.user).select_related('author').prefetch_related(
-        'likes', 'comments'
-    ).annotate(
-        like_count=Count('likes', distinct=True),
-        comment_count=Count('comments', filter=Q(comments__is_hidden=False), distinct=True)
-    ).order_by('-created_at')
+    posts = ForumPost.objects.filter(author=request.user).select_related('author').order_by('-created_at')
     
     context = {
         'posts': posts,
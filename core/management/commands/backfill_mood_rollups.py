@@ -0,0 +1,38 @@
+"""
+Rebuild MoodDailyRollup rows from raw mood entries
+"""
+from django.core.management.base import BaseCommand
+from core.models import MoodEntry, MoodDailyRollup
+from core.mood_rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Backfill daily mood rollups from existing mood entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only rebuild rollups for this user id')
+        parser.add_argument('--users-per-batch', type=int, default=500,
+                            help='Number of users whose entries are grouped per query')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete all existing rollups before rebuilding')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = MoodDailyRollup.objects.all().delete()
+            self.stdout.write(f'Deleted {deleted} existing rollups.')
+
+        if options['user']:
+            user_ids = [options['user']]
+        else:
+            user_ids = list(
+                MoodEntry.objects.order_by('user_id').values_list('user_id', flat=True).distinct()
+            )
+
+        batch = options['users_per_batch']
+        total = 0
+        for i in range(0, len(user_ids), batch):
+            chunk = user_ids[i:i + batch]
+            total += rebuild_rollups(MoodEntry.objects.filter(user_id__in=chunk))
+            self.stdout.write(f'Processed {min(i + batch, len(user_ids))}/{len(user_ids)} users...')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} daily mood rollups.'))
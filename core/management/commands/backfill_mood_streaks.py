@@ -0,0 +1,55 @@
+"""
+Recompute MoodStreak rows from raw mood entries
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.models import MoodEntry, MoodStreak
+from core.mood_streaks import logged_days, recompute_streaks, streaks_from_days
+
+
+class Command(BaseCommand):
+    help = 'Backfill or verify stored mood streaks against mood entry history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only process this user id')
+        parser.add_argument('--verify', action='store_true',
+                            help='Report mismatched streaks without writing')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Users recomputed per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+        if options['user']:
+            user_ids = [options['user']]
+        else:
+            user_ids = list(
+                MoodEntry.objects.order_by('user_id').values_list('user_id', flat=True).distinct()
+            )
+
+        if not options['verify']:
+            for start in range(0, len(user_ids), batch_size):
+                recompute_streaks(user_ids[start:start + batch_size])
+            self.stdout.write(self.style.SUCCESS(f'Recomputed streaks for {len(user_ids)} users.'))
+            return
+
+        stored = {
+            streak.user_id: streak
+            for streak in MoodStreak.objects.filter(user_id__in=user_ids)
+        }
+        mismatches = 0
+        for user_id in user_ids:
+            expected = streaks_from_days(logged_days(user_id))
+            streak = stored.get(user_id)
+            actual = (
+                (streak.current_streak, streak.longest_streak, streak.last_logged_date)
+                if streak else (0, 0, None)
+            )
+            if actual != expected:
+                mismatches += 1
+                self.stdout.write(f'User {user_id}: stored {actual}, expected {expected}')
+
+        if mismatches:
+            self.stdout.write(self.style.WARNING(f'{mismatches} of {len(user_ids)} streaks are out of date.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'All {len(user_ids)} streaks are up to date.'))
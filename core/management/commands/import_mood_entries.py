@@ -0,0 +1,40 @@
+"""
+Bulk import mood history from an NDJSON or CSV file
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.mood_import import IMPORT_FORMATS, import_mood_stream
+
+
+class Command(BaseCommand):
+    help = 'Import mood entries (user, mood, notes, timestamp) from NDJSON or CSV in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='Input format; inferred from the file extension if omitted')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Records validated and inserted per batch')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            with open(path, newline='', encoding='utf-8') as stream:
+                summary = import_mood_stream(stream, fmt, batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        for error in summary['errors']:
+            self.stdout.write(f"Line {error['line']}: {error['error']}")
+        message = (
+            f"Imported {summary['created']} entries, "
+            f"skipped {summary['duplicates']} duplicates, "
+            f"{summary['error_count']} invalid records."
+        )
+        if summary['error_count']:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,22 @@
+"""
+Rebuild the forum full-text search index from visible posts and comments
+"""
+from django.core.management.base import BaseCommand
+from core.forum_search import REBUILD_BATCH_SIZE, get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the forum search index from visible posts and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE,
+                            help='Documents written per batch')
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            self.stdout.write(self.style.WARNING(
+                'This database has no full-text backend; forum search scans posts directly.'
+            ))
+            return
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} forum documents.'))
@@ -0,0 +1,19 @@
+"""
+Recount ForumPost like and visible comment counters from the underlying rows
+"""
+from django.core.management.base import BaseCommand
+from core.forum_counters import reconcile_post_counts
+
+
+class Command(BaseCommand):
+    help = 'Fix drifted ForumPost.like_count and visible_comment_count values'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Posts recounted per batch')
+
+    def handle(self, *args, **options):
+        corrected = reconcile_post_counts(batch_size=options['batch_size'])
+        if corrected:
+            self.stdout.write(self.style.WARNING(f'Corrected counters on {corrected} posts.'))
+        self.stdout.write(self.style.SUCCESS('Forum counters reconciled.'))
@@ -0,0 +1,23 @@
+"""
+Recompute UserMoodRisk rows from the last 30 days of mood entries
+"""
+from django.core.management.base import BaseCommand
+from core.mood_risk import refresh_all_risks, refresh_user_risk
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user mood risk scores; intended to run nightly'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only refresh this user id')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows written per bulk upsert')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            refresh_user_risk(options['user'])
+            self.stdout.write(self.style.SUCCESS(f"Refreshed mood risk for user {options['user']}."))
+            return
+
+        count = refresh_all_risks(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed mood risk for {count} users.'))
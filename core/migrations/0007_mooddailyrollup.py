@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_forumpost_forumlike_forumcomment_forumreport_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MoodDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('mood_sum', models.PositiveIntegerField(default=0)),
+                ('mood_min', models.PositiveSmallIntegerField()),
+                ('mood_max', models.PositiveSmallIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mood_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='core_moodda_day_f44f7e_idx')],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+    ]
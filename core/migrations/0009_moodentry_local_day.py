@@ -0,0 +1,44 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_local_day(apps, schema_editor):
+    MoodEntry = apps.get_model('core', 'MoodEntry')
+    batch = []
+    for entry in MoodEntry.objects.only('id', 'date').iterator(chunk_size=2000):
+        entry.local_day = timezone.localdate(entry.date)
+        batch.append(entry)
+        if len(batch) >= 2000:
+            MoodEntry.objects.bulk_update(batch, ['local_day'])
+            batch = []
+    if batch:
+        MoodEntry.objects.bulk_update(batch, ['local_day'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_moodstreak'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moodentry',
+            name='local_day',
+            field=models.DateField(editable=False, help_text="Calendar day of the entry in the writer's timezone", null=True),
+        ),
+        migrations.RunPython(populate_local_day, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='moodentry',
+            name='local_day',
+            field=models.DateField(editable=False, help_text="Calendar day of the entry in the writer's timezone"),
+        ),
+        migrations.AddIndex(
+            model_name='moodentry',
+            index=models.Index(fields=['user', '-date'], name='core_mooden_user_id_6200e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moodentry',
+            index=models.Index(fields=['user', 'local_day'], name='core_mooden_user_id_63b9f5_idx'),
+        ),
+    ]
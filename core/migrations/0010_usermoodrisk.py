@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_moodentry_local_day'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMoodRisk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('avg_7d', models.FloatField(blank=True, null=True)),
+                ('avg_30d', models.FloatField(blank=True, null=True)),
+                ('entries_30d', models.PositiveIntegerField(default=0)),
+                ('slope_30d', models.FloatField(default=0, help_text='Least-squares change in mood per day over 30 days')),
+                ('risk_score', models.FloatField(default=0)),
+                ('needs_attention', models.BooleanField(default=False)),
+                ('last_entry_date', models.DateField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='mood_risk', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-risk_score'],
+                'indexes': [models.Index(fields=['needs_attention', '-risk_score'], name='core_usermo_needs_a_5d0f4c_idx')],
+            },
+        ),
+    ]
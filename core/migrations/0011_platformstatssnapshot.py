@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_usermoodrisk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stats', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('computation_ms', models.FloatField(default=0, help_text='Time taken to compute the snapshot')),
+            ],
+            options={
+                'ordering': ['-computed_at'],
+                'get_latest_by': 'computed_at',
+            },
+        ),
+    ]
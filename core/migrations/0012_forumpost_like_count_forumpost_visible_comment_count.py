@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:27
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    ForumPost = apps.get_model('core', 'ForumPost')
+    ForumLike = apps.get_model('core', 'ForumLike')
+    ForumComment = apps.get_model('core', 'ForumComment')
+
+    def count_of(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(post_id=OuterRef('pk')).order_by().values('post_id')
+            .annotate(count=Count('id')).values('count'),
+            output_field=IntegerField(),
+        ), 0)
+
+    ForumPost.objects.update(
+        like_count=count_of(ForumLike.objects.all()),
+        visible_comment_count=count_of(ForumComment.objects.filter(is_hidden=False)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_platformstatssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumpost',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='forumpost',
+            name='visible_comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
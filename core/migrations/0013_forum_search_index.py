@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:05
+
+from django.db import migrations
+
+SEARCH_TABLE = 'core_forum_search'
+
+
+def document_id(kind, object_id):
+    # Posts and comments share one table; the kind is folded into the row id
+    return object_id * 2 + (1 if kind == 'comment' else 0)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    ForumPost = apps.get_model('core', 'ForumPost')
+    ForumComment = apps.get_model('core', 'ForumComment')
+
+    rows = [
+        (document_id('post', post_id), post_id, content)
+        for post_id, content in ForumPost.objects.filter(is_hidden=False).values_list('id', 'content')
+    ] + [
+        (document_id('comment', comment_id), post_id, content)
+        for comment_id, post_id, content in ForumComment.objects.filter(
+            is_hidden=False, post__is_hidden=False
+        ).values_list('id', 'post_id', 'content')
+    ]
+
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+                f"USING fts5(content, post_id UNINDEXED, tokenize = 'porter unicode61')"
+            )
+            insert = f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, post_id, content) VALUES (%s, %s, %s)'
+        else:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+                f'id bigint PRIMARY KEY, post_id bigint NOT NULL, document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)'
+            )
+            insert = (
+                f'INSERT INTO {SEARCH_TABLE} (id, post_id, document) '
+                f"VALUES (%s, %s, to_tsvector('english', %s)) ON CONFLICT (id) DO NOTHING"
+            )
+        if rows:
+            cursor.executemany(insert, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_forumpost_like_count_forumpost_visible_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -36,6 +36,24 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+class MoodEntryQuerySet(models.QuerySet):
+    # Aggregate key for each mood level, as used by the summary templates
+    LEVEL_KEYS = {5: 'very_happy', 4: 'happy', 3: 'neutral', 2: 'sad', 1: 'very_sad'}
+
+    def distribution(self):
+        """Total, average, with-notes and per-level counts in a single aggregate query"""
+        stats = self.order_by().aggregate(
+            total=models.Count('id'),
+            avg_mood=models.Avg('mood'),
+            with_notes=models.Count('id', filter=~models.Q(notes='')),
+            **{
+                key: models.Count('id', filter=models.Q(mood=level))
+                for level, key in self.LEVEL_KEYS.items()
+            },
+        )
+        stats['avg_mood'] = stats['avg_mood'] or 0
+        return stats
+
 class MoodEntry(models.Model):
     MOOD_CHOICES = [
         (1, 'Very Sad'),
@@ -49,12 +67,99 @@ class MoodEntry(models.Model):
     mood = models.IntegerField(choices=MOOD_CHOICES)
     notes = models.TextField(blank=True)
     date = models.DateTimeField(default=timezone.now)
+    local_day = models.DateField(editable=False, help_text="Calendar day of the entry in the writer's timezone")
+
+    objects = MoodEntryQuerySet.as_manager()
     
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', '-date']),
+            models.Index(fields=['user', 'local_day']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.get_mood_display()} on {self.date.date()}"
+    
+    def save(self, *args, **kwargs):
+        # Bucket the entry by day at write time so day lookups never cast the datetime
+        self.local_day = timezone.localdate(self.date)
+        super().save(*args, **kwargs)
+
+class MoodDailyRollup(models.Model):
+    """Per-user, per-day mood aggregates maintained from MoodEntry writes"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mood_rollups')
+    day = models.DateField()
+    entry_count = models.PositiveIntegerField(default=0)
+    mood_sum = models.PositiveIntegerField(default=0)
+    mood_min = models.PositiveSmallIntegerField()
+    mood_max = models.PositiveSmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-day']
+        unique_together = ['user', 'day']
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.day} ({self.entry_count} entries)"
+
+    @property
+    def avg_mood(self):
+        return self.mood_sum / self.entry_count if self.entry_count else 0
+
+class MoodStreak(models.Model):
+    """Consecutive-day mood logging streak, updated as entries are written"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='mood_streak')
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_logged_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.current_streak} day streak"
+
+    def streak_on(self, day):
+        """Streak length as of ``day``; zero once a day has been missed"""
+        if self.last_logged_date == day:
+            return self.current_streak
+        return 0
+
+class UserMoodRisk(models.Model):
+    """Rolling mood averages, trend and risk flag per user, refreshed on write and nightly"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='mood_risk')
+    avg_7d = models.FloatField(null=True, blank=True)
+    avg_30d = models.FloatField(null=True, blank=True)
+    entries_30d = models.PositiveIntegerField(default=0)
+    slope_30d = models.FloatField(default=0, help_text="Least-squares change in mood per day over 30 days")
+    risk_score = models.FloatField(default=0)
+    needs_attention = models.BooleanField(default=False)
+    last_entry_date = models.DateField(null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-risk_score']
+        indexes = [
+            models.Index(fields=['needs_attention', '-risk_score']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - risk {self.risk_score:.2f}"
+
+class PlatformStatsSnapshot(models.Model):
+    """Platform-wide counts for the admin dashboards, recomputed periodically or on demand"""
+    stats = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(default=timezone.now, db_index=True)
+    computation_ms = models.FloatField(default=0, help_text="Time taken to compute the snapshot")
+
+    class Meta:
+        ordering = ['-computed_at']
+        get_latest_by = 'computed_at'
+
+    def __str__(self):
+        return f"Platform stats at {self.computed_at:%Y-%m-%d %H:%M} ({self.computation_ms:.0f} ms)"
 
 class Organization(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='organization_profile')
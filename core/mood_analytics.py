@@ -0,0 +1,168 @@
+"""
+Mood Analytics Engine
+Builds the admin mood analytics context from a fixed number of grouped queries
+"""
+from datetime import timedelta
+from django.db.models import Count, F, FloatField, Max, Sum
+from django.db.models.functions import Cast
+from .models import MoodDailyRollup, MoodEntry, User
+from . import mood_risk
+
+
+class MoodAnalyticsEngine:
+    """
+    Aggregates mood entries of all users for a date window.
+
+    The number of queries is constant: it does not grow with the number
+    of days in the window or the number of users who logged a mood.
+    Totals, the daily series and per-user figures are read from
+    MoodDailyRollup; only the per-level distribution scans raw entries.
+    Users needing attention come from the precomputed UserMoodRisk table:
+    their scores always reflect the last 30 days, and only users who
+    logged a mood within the selected window are listed.
+    """
+
+    def __init__(self, start_date, end_date, limit=10):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.limit = limit
+
+    def get_entries(self):
+        return MoodEntry.objects.filter(local_day__gte=self.start_date, local_day__lte=self.end_date)
+
+    def get_rollups(self):
+        return MoodDailyRollup.objects.filter(day__gte=self.start_date, day__lte=self.end_date)
+
+    def get_eligible_users(self):
+        """Active, non-admin users - the population engagement is measured against"""
+        return User.objects.filter(is_staff=False, is_superuser=False, is_active=True)
+
+    def totals(self):
+        """Entry count, mood sum and distinct users for the window in one query"""
+        return self.get_rollups().order_by().aggregate(
+            total=Sum('entry_count'),
+            mood_sum=Sum('mood_sum'),
+            active_users=Count('user', distinct=True),
+        )
+
+    def distribution(self):
+        """Counts per mood level and entries with notes in one query"""
+        return self.get_entries().distribution()
+
+    def daily_series(self):
+        """Zero-filled list of per-day averages and counts for the whole window"""
+        rows = self.get_rollups().values('day').annotate(
+            entry_count=Sum('entry_count'),
+            mood_sum=Sum('mood_sum'),
+        ).order_by('day')
+        by_day = {row['day']: row for row in rows}
+
+        daily_data = []
+        current_date = self.start_date
+        while current_date <= self.end_date:
+            row = by_day.get(current_date)
+            daily_data.append({
+                'date': current_date,
+                'avg_mood': round(row['mood_sum'] / row['entry_count'], 1) if row else None,
+                'entry_count': row['entry_count'] if row else 0,
+            })
+            current_date += timedelta(days=1)
+        return daily_data
+
+    def per_user(self):
+        """Per-user entry counts, mood sums and averages for the window"""
+        return self.get_rollups().values('user').annotate(
+            entry_count=Sum('entry_count'),
+            mood_sum=Sum('mood_sum'),
+            last_entry_date=Max('day'),
+        ).annotate(
+            avg_mood=Cast('mood_sum', FloatField()) / F('entry_count'),
+        )
+
+    def users_needing_attention(self):
+        """Highest-risk users with an entry in the window, in the shape the template expects"""
+        return [{
+            'user': risk.user,
+            'avg_mood': round(risk.avg_30d, 1),
+            'entry_count': risk.entries_30d,
+            'last_entry_date': risk.last_entry_date,
+            'risk_score': risk.risk_score,
+        } for risk in mood_risk.users_needing_attention(self.limit, since=self.start_date)]
+
+    def most_active_users(self):
+        """Users with the most entries in the window"""
+        return list(self.per_user().order_by('-entry_count', 'user')[:self.limit])
+
+    def build_context(self):
+        """Return the full template context for the admin mood analytics page"""
+        totals = self.totals()
+        total_entries = totals['total'] or 0
+        active_users_count = totals['active_users']
+        total_users = self.get_eligible_users().count()
+
+        context = {
+            'total_entries': total_entries,
+            'active_users_count': active_users_count,
+            'total_users': total_users,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+        }
+
+        if not total_entries:
+            context.update({
+                'engagement_rate': 0,
+                'avg_entries_per_user': 0,
+                'avg_mood': 0,
+                'very_happy_count': 0,
+                'happy_count': 0,
+                'neutral_count': 0,
+                'sad_count': 0,
+                'very_sad_count': 0,
+                'positive_days': 0,
+                'negative_days': 0,
+                'positive_percentage': 0,
+                'negative_percentage': 0,
+                'neutral_percentage': 0,
+                'entries_with_notes_count': 0,
+                'notes_percentage': 0,
+                'users_needing_attention': self.users_needing_attention(),
+                'most_active_users': [],
+                'daily_data': [],
+            })
+            return context
+
+        stats = self.distribution()
+        positive_days = stats['very_happy'] + stats['happy']
+        negative_days = stats['sad'] + stats['very_sad']
+        engagement_rate = (active_users_count / total_users) * 100 if total_users > 0 else 0
+
+        active_rows = self.most_active_users()
+        users = User.objects.in_bulk({row['user'] for row in active_rows})
+
+        most_active_users = [{
+            'user': users[row['user']],
+            'entry_count': row['entry_count'],
+            'avg_mood': round(row['avg_mood'], 1) if row['avg_mood'] else 0,
+        } for row in active_rows]
+
+        context.update({
+            'engagement_rate': round(engagement_rate, 1),
+            'avg_entries_per_user': round(total_entries / active_users_count, 1),
+            'avg_mood': round(totals['mood_sum'] / total_entries, 1),
+            'very_happy_count': stats['very_happy'],
+            'happy_count': stats['happy'],
+            'neutral_count': stats['neutral'],
+            'sad_count': stats['sad'],
+            'very_sad_count': stats['very_sad'],
+            'positive_days': positive_days,
+            'negative_days': negative_days,
+            'positive_percentage': round(positive_days / total_entries * 100, 1),
+            'negative_percentage': round(negative_days / total_entries * 100, 1),
+            'neutral_percentage': round(stats['neutral'] / total_entries * 100, 1),
+            'entries_with_notes_count': stats['with_notes'],
+            'notes_percentage': round(stats['with_notes'] / total_entries * 100, 1),
+            'users_needing_attention': self.users_needing_attention(),
+            'most_active_users': most_active_users,
+            'daily_data': self.daily_series(),
+        })
+        return context
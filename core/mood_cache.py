@@ -0,0 +1,42 @@
+"""
+Mood Tracker Cache
+Per-user, per-day "mood logged today" flag kept in Django's cache
+"""
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.utils import timezone
+from .models import MoodEntry
+
+
+def logged_today_key(user_id, day):
+    return f'mood_logged:{user_id}:{day.isoformat()}'
+
+
+def seconds_until_local_midnight():
+    """Seconds left in the current local day, used as the flag's timeout"""
+    now = timezone.localtime()
+    midnight = timezone.make_aware(
+        datetime.combine(now.date() + timedelta(days=1), time.min),
+        timezone.get_current_timezone(),
+    )
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def set_logged_flag(user_id, day, logged):
+    """Store the flag for ``day``; only today's flag is worth caching"""
+    if day == timezone.localdate():
+        cache.set(logged_today_key(user_id, day), logged, seconds_until_local_midnight())
+
+
+def clear_logged_flag(user_id, day):
+    cache.delete(logged_today_key(user_id, day))
+
+
+def has_logged_today(user):
+    """Answer from the cache, falling back to one indexed query on a miss"""
+    today = timezone.localdate()
+    logged = cache.get(logged_today_key(user.pk, today))
+    if logged is None:
+        logged = MoodEntry.objects.filter(user=user, local_day=today).exists()
+        set_logged_flag(user.pk, today, logged)
+    return logged
@@ -0,0 +1,91 @@
+"""
+Mood Data Views - Bulk import and export of mood history
+"""
+from datetime import timedelta
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET, require_POST
+from .mood_export import EXPORT_FORMATS, range_entries, stream_mood_export, user_entries
+from .mood_import import IMPORT_FORMATS, import_mood_stream, iter_text_lines
+
+
+def is_admin(user):
+    """Check if user is admin"""
+    return user.is_superuser or user.is_staff
+
+
+def import_format(request, default='ndjson'):
+    """Pick the import format from the request parameter or content type"""
+    fmt = request.GET.get('format') or request.POST.get('format')
+    if fmt:
+        return fmt.lower()
+    content_type = request.content_type or ''
+    if 'csv' in content_type:
+        return 'csv'
+    return default
+
+
+@login_required
+@user_passes_test(is_admin)
+@require_POST
+def admin_mood_import(request):
+    """Import NDJSON or CSV mood history, streamed from an upload or the request body"""
+    fmt = import_format(request)
+    if fmt not in IMPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': f'Unsupported format: {fmt}'}, status=400)
+
+    try:
+        batch_size = int(request.GET.get('batch_size') or request.POST.get('batch_size') or 1000)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'batch_size must be an integer'}, status=400)
+    if batch_size < 1:
+        return JsonResponse({'success': False, 'error': 'batch_size must be positive'}, status=400)
+
+    upload = request.FILES.get('file')
+    source = upload if upload is not None else request
+    try:
+        summary = import_mood_stream(iter_text_lines(source), fmt, batch_size=batch_size)
+    except UnicodeDecodeError:
+        return JsonResponse({'success': False, 'error': 'Import must be UTF-8 encoded'}, status=400)
+
+    return JsonResponse({'success': True, **summary})
+
+
+@login_required
+@require_GET
+def export_mood_history(request):
+    """Stream the current user's full mood history as CSV or NDJSON"""
+    fmt = request.GET.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest(f'Unsupported format: {fmt}')
+
+    filename = f'mood-history-{request.user.username}'
+    return stream_mood_export(user_entries(request.user), fmt, filename)
+
+
+@login_required
+@user_passes_test(is_admin)
+@require_GET
+def admin_mood_export(request):
+    """Stream every user's mood entries for a date range (defaults to the last 30 days)"""
+    fmt = request.GET.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest(f'Unsupported format: {fmt}')
+
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=29)
+    try:
+        if request.GET.get('start'):
+            start_date = parse_date(request.GET['start'])
+        if request.GET.get('end'):
+            end_date = parse_date(request.GET['end'])
+    except ValueError:
+        # Well-formed but impossible dates such as 2024-02-30
+        return HttpResponseBadRequest('Invalid date range')
+    if start_date is None or end_date is None or start_date > end_date:
+        return HttpResponseBadRequest('Invalid date range')
+
+    filename = f'mood-entries-{start_date}-to-{end_date}'
+    return stream_mood_export(range_entries(start_date, end_date), fmt, filename)
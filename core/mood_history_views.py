@@ -6,10 +6,11 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView
 from django.utils import timezone
-from django.db.models import Avg, Count, Q
 from datetime import datetime, timedelta
 from collections import defaultdict
 from .models import MoodEntry
+from . import mood_streaks
+from .mood_stats import MoodStats
 
 
 @login_required
@@ -19,29 +20,29 @@ def mood_history_summary(request):
     days = int(request.GET.get('days', 30))  # Default 30 days
     
     # Calculate date range
-    end_date = timezone.now().date()
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=days-1)
     
     # Get mood entries for the period
     mood_entries = MoodEntry.objects.filter(
         user=request.user,
-        date__gte=start_date,
-        date__lte=end_date
+        local_day__gte=start_date,
+        local_day__lte=end_date
     ).order_by('-date')
     
-    # Calculate statistics
-    total_entries = mood_entries.count()
+    # Totals, average and per-level counts from a single aggregate query
+    distribution = mood_entries.distribution()
+    total_entries = distribution['total']
+    avg_mood = distribution['avg_mood']
+    entries_with_notes_count = distribution['with_notes']
     
     if total_entries > 0:
-        # Average mood
-        avg_mood = mood_entries.aggregate(Avg('mood'))['mood__avg']
-        
         # Categorize moods
-        very_happy_count = mood_entries.filter(mood=5).count()
-        happy_count = mood_entries.filter(mood=4).count()
-        neutral_count = mood_entries.filter(mood=3).count()
-        sad_count = mood_entries.filter(mood=2).count()
-        very_sad_count = mood_entries.filter(mood=1).count()
+        very_happy_count = distribution['very_happy']
+        happy_count = distribution['happy']
+        neutral_count = distribution['neutral']
+        sad_count = distribution['sad']
+        very_sad_count = distribution['very_sad']
         
         # Calculate percentages
         positive_days = very_happy_count + happy_count
@@ -65,11 +66,16 @@ def mood_history_summary(request):
         # Calculate streak
         current_streak = calculate_mood_streak(request.user)
         
-        # Get entries with notes
-        entries_with_notes = mood_entries.filter(notes__isnull=False).exclude(notes='')
+        # Most recent entries with notes; the full count comes from the distribution
+        entries_with_notes = mood_entries.exclude(notes='')[:10]
         
-        # Analyze mood trends
-        trend = analyze_mood_trend(mood_entries, days)
+        # Trend, rolling average, volatility and weekday pattern from one vectorized pass
+        stats = MoodStats.for_user(request.user, start_date, end_date)
+        trend = stats.trend()
+        mood_slope = round(stats.slope() * 7, 2)
+        mood_volatility = round(stats.volatility(), 2)
+        weekday_profile = stats.weekday_profile()
+        rolling_mood = stats.rolling_series()
         
         # Generate insights
         insights = generate_mood_insights(
@@ -79,7 +85,8 @@ def mood_history_summary(request):
             most_common_mood=most_common_mood,
             trend=trend,
             total_entries=total_entries,
-            days=days
+            days=days,
+            weekday_profile=weekday_profile
         )
         
     else:
@@ -93,6 +100,9 @@ def mood_history_summary(request):
         current_streak = 0
         entries_with_notes = mood_entries.none()
         trend = 'stable'
+        mood_slope = mood_volatility = 0
+        weekday_profile = []
+        rolling_mood = []
         insights = []
     
     context = {
@@ -113,7 +123,12 @@ def mood_history_summary(request):
         'most_common_mood_name': mood_names[most_common_mood],
         'current_streak': current_streak,
         'entries_with_notes': entries_with_notes,
+        'entries_with_notes_count': entries_with_notes_count,
         'trend': trend,
+        'mood_slope': mood_slope,
+        'mood_volatility': mood_volatility,
+        'weekday_profile': weekday_profile,
+        'rolling_mood': rolling_mood,
         'insights': insights,
         'days_filter': days,
         'start_date': start_date,
@@ -125,48 +140,11 @@ def mood_history_summary(request):
 
 def calculate_mood_streak(user):
     """Calculate consecutive days of mood logging"""
-    today = timezone.now().date()
-    streak = 0
-    current_date = today
-    
-    while True:
-        if MoodEntry.objects.filter(user=user, date=current_date).exists():
-            streak += 1
-            current_date -= timedelta(days=1)
-        else:
-            break
-    
-    return streak
-
-
-def analyze_mood_trend(mood_entries, days):
-    """Analyze if mood is improving, declining, or stable"""
-    if mood_entries.count() < 3:
-        return 'stable'
-    
-    # Split entries into two halves
-    half_point = mood_entries.count() // 2
-    recent_entries = list(mood_entries[:half_point])
-    older_entries = list(mood_entries[half_point:])
-    
-    if recent_entries and older_entries:
-        recent_avg = sum(e.mood for e in recent_entries) / len(recent_entries)
-        older_avg = sum(e.mood for e in older_entries) / len(older_entries)
-        
-        difference = recent_avg - older_avg
-        
-        if difference > 0.3:
-            return 'improving'
-        elif difference < -0.3:
-            return 'declining'
-        else:
-            return 'stable'
-    
-    return 'stable'
+    return mood_streaks.current_streak(user)
 
 
 def generate_mood_insights(avg_mood, positive_percentage, negative_percentage, 
-                          most_common_mood, trend, total_entries, days):
+                          most_common_mood, trend, total_entries, days, weekday_profile=None):
     """Generate personalized insights based on mood data"""
     insights = []
     
@@ -225,6 +203,19 @@ def generate_mood_insights(avg_mood, positive_percentage, negative_percentage,
             'message': f'{negative_percentage:.0f}% of your days have been difficult. Please reach out for support if needed.'
         })
     
+    # Weekday pattern insight
+    logged_weekdays = [d for d in weekday_profile or [] if d['avg_mood'] is not None]
+    if len(logged_weekdays) >= 2:
+        lowest = min(logged_weekdays, key=lambda d: d['avg_mood'])
+        highest = max(logged_weekdays, key=lambda d: d['avg_mood'])
+        if highest['avg_mood'] - lowest['avg_mood'] >= 1:
+            insights.append({
+                'type': 'info',
+                'icon': 'fa-calendar-week',
+                'title': 'Weekly Pattern',
+                'message': f'Your mood tends to be lowest on {lowest["day"]}s and highest on {highest["day"]}s.'
+            })
+    
     # Consistency insight
     if total_entries >= days * 0.8:  # Logged 80%+ of days
         insights.append({
@@ -249,25 +240,25 @@ def mood_reasons_summary(request):
     """Summary of reasons/notes grouped by mood level"""
     days = int(request.GET.get('days', 30))
     
-    end_date = timezone.now().date()
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=days-1)
     
     # Get entries with notes, grouped by mood
     happy_entries = MoodEntry.objects.filter(
         user=request.user,
-        date__gte=start_date,
+        local_day__gte=start_date,
         mood__gte=4
     ).exclude(notes='').order_by('-date')
     
     neutral_entries = MoodEntry.objects.filter(
         user=request.user,
-        date__gte=start_date,
+        local_day__gte=start_date,
         mood=3
     ).exclude(notes='').order_by('-date')
     
     sad_entries = MoodEntry.objects.filter(
         user=request.user,
-        date__gte=start_date,
+        local_day__gte=start_date,
         mood__lte=2
     ).exclude(notes='').order_by('-date')
     
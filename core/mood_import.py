@@ -0,0 +1,217 @@
+"""
+Bulk Mood Import
+Streams NDJSON or CSV mood history into MoodEntry in validated, batched chunks
+"""
+import codecs
+import csv
+import json
+from datetime import datetime, time
+from itertools import islice
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .dashboard_cache import invalidate_dashboards
+from .models import MoodEntry, User
+from .mood_cache import set_logged_flag
+from .mood_risk import refresh_risks
+from .mood_rollups import rebuild_rollups
+from .mood_streaks import recompute_streaks
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+MAX_REPORTED_ERRORS = 100
+
+
+class MoodImportError(ValueError):
+    """A single import record failed validation"""
+
+
+def iter_text_lines(stream, encoding='utf-8'):
+    """Decode an iterable of byte lines (request body, uploaded file) lazily"""
+    return codecs.iterdecode(stream, encoding)
+
+
+def parse_records(lines, fmt):
+    """Yield (line_number, record dict) pairs from NDJSON or CSV text lines"""
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'ndjson':
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            yield line_number, record
+    else:
+        raise ValueError(f'Unsupported import format: {fmt}')
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 datetime or date; naive values use the current timezone"""
+    value = '' if value is None else str(value).strip()
+    try:
+        moment = parse_datetime(value)
+        day = parse_date(value) if moment is None else None
+    except (TypeError, ValueError):
+        # Well-formed but impossible dates such as 2024-02-30
+        raise MoodImportError(f'Invalid timestamp: {value!r}')
+    if moment is None:
+        if day is None:
+            raise MoodImportError(f'Invalid timestamp: {value!r}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class MoodImporter:
+    """
+    Imports mood records chunk by chunk.
+
+    Each chunk costs a fixed number of queries: one user lookup, one
+    duplicate check, the bulk insert, and one rollup, streak and risk
+    refresh for the whole chunk. Entries are deduplicated on (user, day);
+    the first record for a day wins and days that already have an entry
+    are skipped.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.created = 0
+        self.duplicates = 0
+        self.errors = []
+        self.error_count = 0
+
+    def add_error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def run(self, records):
+        """Import an iterable of (line_number, record) pairs"""
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.batch_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+    def resolve_users(self, chunk):
+        """Map the usernames and ids referenced by a chunk to user ids in one query"""
+        usernames, user_ids = set(), set()
+        for _, record in chunk:
+            if not isinstance(record, dict):
+                continue
+            if str(record.get('user_id') or '').strip().isdigit():
+                user_ids.add(int(record['user_id']))
+            elif record.get('user'):
+                usernames.add(str(record['user']).strip())
+
+        by_username, by_id = {}, set()
+        for user_id, username in User.objects.filter(
+            Q(username__in=usernames) | Q(id__in=user_ids)
+        ).values_list('id', 'username'):
+            by_username[username] = user_id
+            by_id.add(user_id)
+        return by_username, by_id
+
+    def validate(self, record, by_username, by_id):
+        if not isinstance(record, dict):
+            raise MoodImportError('Malformed record')
+
+        raw_id = str(record.get('user_id') or '').strip()
+        if raw_id.isdigit():
+            user_id = int(raw_id)
+            if user_id not in by_id:
+                raise MoodImportError(f'Unknown user id: {raw_id}')
+        else:
+            username = str(record.get('user') or '').strip()
+            if username not in by_username:
+                raise MoodImportError(f'Unknown user: {username!r}')
+            user_id = by_username[username]
+
+        try:
+            mood = int(record.get('mood'))
+        except (TypeError, ValueError):
+            raise MoodImportError(f'Invalid mood: {record.get("mood")!r}')
+        if mood < 1 or mood > 5:
+            raise MoodImportError(f'Mood must be between 1 and 5, got {mood}')
+
+        moment = parse_timestamp(record.get('timestamp'))
+        return MoodEntry(
+            user_id=user_id,
+            mood=mood,
+            notes=str(record.get('notes') or '').strip(),
+            date=moment,
+            local_day=timezone.localdate(moment),
+        )
+
+    def import_chunk(self, chunk):
+        by_username, by_id = self.resolve_users(chunk)
+
+        entries = {}
+        for line_number, record in chunk:
+            try:
+                entry = self.validate(record, by_username, by_id)
+            except MoodImportError as e:
+                self.add_error(line_number, str(e))
+                continue
+            key = (entry.user_id, entry.local_day)
+            if key in entries:
+                self.duplicates += 1
+                continue
+            entries[key] = entry
+
+        if not entries:
+            return
+
+        user_ids = {user_id for user_id, _ in entries}
+        days = [day for _, day in entries]
+        existing = set(MoodEntry.objects.filter(
+            user_id__in=user_ids,
+            local_day__gte=min(days),
+            local_day__lte=max(days),
+        ).values_list('user_id', 'local_day'))
+
+        new_entries = [entry for key, entry in entries.items() if key not in existing]
+        self.duplicates += len(entries) - len(new_entries)
+        if not new_entries:
+            return
+
+        with transaction.atomic():
+            MoodEntry.objects.bulk_create(new_entries, batch_size=self.batch_size)
+            # bulk_create skips signals, so derived tables are refreshed once per chunk
+            rebuild_rollups(MoodEntry.objects.filter(
+                user_id__in=user_ids,
+                local_day__gte=min(days),
+                local_day__lte=max(days),
+            ))
+            recompute_streaks(user_ids)
+            refresh_risks(user_ids)
+        invalidate_dashboards(user_ids)
+
+        today = timezone.localdate()
+        for entry in new_entries:
+            if entry.local_day == today:
+                set_logged_flag(entry.user_id, today, True)
+        self.created += len(new_entries)
+
+
+def import_mood_stream(lines, fmt, batch_size=1000):
+    """Import decoded text lines in the given format and return a summary"""
+    return MoodImporter(batch_size=batch_size).run(parse_records(lines, fmt))
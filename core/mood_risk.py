@@ -0,0 +1,124 @@
+"""
+Mood Risk Scores
+Maintains UserMoodRisk from recent mood entries so attention lists are a single indexed read
+"""
+from datetime import timedelta
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .models import MoodEntry, UserMoodRisk
+from .mood_stats import MoodStats
+
+RISK_WINDOW_DAYS = 30
+
+# Users whose recent average mood falls below this value need attention
+ATTENTION_THRESHOLD = 2.5
+
+RISK_FIELDS = [
+    'avg_7d', 'avg_30d', 'entries_30d', 'slope_30d',
+    'risk_score', 'needs_attention', 'last_entry_date',
+]
+
+
+def risk_window(today=None):
+    end_date = today or timezone.localdate()
+    return end_date - timedelta(days=RISK_WINDOW_DAYS - 1), end_date
+
+
+def risk_values(stats):
+    """
+    Derive the stored risk fields from a 30-day MoodStats.
+
+    The score is the distance of the recent average below a perfect 5,
+    plus the projected weekly decline when the trend is downward.
+    """
+    avg_7d = stats.trailing_mean(7)
+    avg_30d = stats.trailing_mean(RISK_WINDOW_DAYS)
+    slope = stats.slope()
+    recent = avg_7d if avg_7d is not None else avg_30d
+    risk_score = (5 - recent) + max(0.0, -slope * 7)
+    return {
+        'avg_7d': round(avg_7d, 2) if avg_7d is not None else None,
+        'avg_30d': round(avg_30d, 2),
+        'entries_30d': stats.entry_count,
+        'slope_30d': round(slope, 4),
+        'risk_score': round(risk_score, 2),
+        'needs_attention': recent < ATTENTION_THRESHOLD or avg_30d < ATTENTION_THRESHOLD,
+        'last_entry_date': stats.start_date + timedelta(days=stats.last_offset()),
+    }
+
+
+def refresh_user_risk(user_id, today=None):
+    """Recompute one user's risk row from their last 30 days of entries"""
+    start_date, end_date = risk_window(today)
+    stats = MoodStats.for_user(user_id, start_date, end_date)
+    if not stats.entry_count:
+        UserMoodRisk.objects.filter(user_id=user_id).delete()
+        return None
+    risk, _ = UserMoodRisk.objects.update_or_create(user_id=user_id, defaults=risk_values(stats))
+    return risk
+
+
+def refresh_all_risks(today=None, batch_size=1000):
+    """
+    Recompute every user's risk row from one query over the window.
+
+    Users without entries in the window have their rows removed.
+    """
+    return refresh_risks(today=today, batch_size=batch_size)
+
+
+def refresh_risks(user_ids=None, today=None, batch_size=1000):
+    """
+    Recompute the risk rows of ``user_ids`` (every user when None) in a fixed number of queries.
+
+    Used by writes that skip signals, such as bulk imports.
+    """
+    start_date, end_date = risk_window(today)
+    entries = MoodEntry.objects.filter(local_day__gte=start_date, local_day__lte=end_date)
+    stale = UserMoodRisk.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+        stale = stale.filter(user_id__in=user_ids)
+    rows = list(entries.order_by('user_id').values_list('user_id', 'local_day', 'mood'))
+    data = np.array(rows, dtype=[('user', 'i8'), ('day', 'datetime64[D]'), ('mood', 'f8')])
+    offsets = (data['day'] - np.datetime64(start_date, 'D')).astype(np.int64)
+
+    # Rows are sorted by user, so each user's entries are one contiguous slice
+    risk_user_ids, starts = np.unique(data['user'], return_index=True)
+    bounds = list(starts[1:]) + [len(data)]
+    computed_at = timezone.now()
+    risks = []
+    for user_id, start, stop in zip(risk_user_ids.tolist(), starts, bounds):
+        stats = MoodStats(offsets[start:stop], data['mood'][start:stop], start_date, RISK_WINDOW_DAYS)
+        risks.append(UserMoodRisk(user_id=user_id, computed_at=computed_at, **risk_values(stats)))
+
+    with transaction.atomic():
+        UserMoodRisk.objects.bulk_create(
+            risks,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=RISK_FIELDS + ['computed_at'],
+        )
+        # Rows not touched above belong to users with no entries in the window
+        stale.filter(computed_at__lt=computed_at).delete()
+    return len(risks)
+
+
+def users_needing_attention(limit=10, since=None):
+    """
+    Highest-risk flagged users, read with one query from the risk index.
+
+    Scores always cover the last 30 days; ``since`` keeps only users who
+    logged a mood on or after that day.
+    """
+    risks = UserMoodRisk.objects.filter(
+        needs_attention=True,
+        user__is_staff=False,
+        user__is_superuser=False,
+        user__is_active=True,
+    )
+    if since is not None:
+        risks = risks.filter(last_entry_date__gte=since)
+    return list(risks.select_related('user').order_by('-risk_score')[:limit])
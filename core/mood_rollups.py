@@ -0,0 +1,72 @@
+"""
+Daily Mood Rollups
+Keeps MoodDailyRollup in sync with MoodEntry and provides rollup-based statistics
+"""
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from .models import MoodEntry, MoodDailyRollup
+
+
+def refresh_rollup(user_id, day):
+    """Recompute the rollup row for one user and day from its mood entries"""
+    stats = MoodEntry.objects.filter(
+        user_id=user_id, local_day=day
+    ).order_by().aggregate(
+        entry_count=Count('id'),
+        mood_sum=Sum('mood'),
+        mood_min=Min('mood'),
+        mood_max=Max('mood'),
+    )
+
+    if not stats['entry_count']:
+        MoodDailyRollup.objects.filter(user_id=user_id, day=day).delete()
+        return None
+
+    rollup, _ = MoodDailyRollup.objects.update_or_create(
+        user_id=user_id, day=day, defaults=stats
+    )
+    return rollup
+
+
+def rebuild_rollups(entries=None, batch_size=1000):
+    """
+    Rebuild rollups from raw mood entries with a single grouped query.
+
+    Only the (user, day) pairs covered by ``entries`` are replaced, so a
+    filtered queryset can be used to backfill one user or one date range.
+    """
+    if entries is None:
+        entries = MoodEntry.objects.all()
+
+    rows = entries.annotate(
+        day=F('local_day')
+    ).order_by().values('user_id', 'day').annotate(
+        entry_count=Count('id'),
+        mood_sum=Sum('mood'),
+        mood_min=Min('mood'),
+        mood_max=Max('mood'),
+    )
+
+    rollups = [MoodDailyRollup(**row) for row in rows]
+    user_ids = {rollup.user_id for rollup in rollups}
+    days = [rollup.day for rollup in rollups]
+
+    with transaction.atomic():
+        if rollups:
+            MoodDailyRollup.objects.filter(
+                user_id__in=user_ids, day__gte=min(days), day__lte=max(days)
+            ).delete()
+        MoodDailyRollup.objects.bulk_create(rollups, batch_size=batch_size)
+
+    return len(rollups)
+
+
+def rollup_totals(rollups):
+    """Return entry count and average mood over a rollup queryset in one query"""
+    totals = rollups.order_by().aggregate(
+        entry_count=Sum('entry_count'),
+        mood_sum=Sum('mood_sum'),
+    )
+    entry_count = totals['entry_count'] or 0
+    avg_mood = totals['mood_sum'] / entry_count if entry_count else 0
+    return entry_count, avg_mood
@@ -0,0 +1,133 @@
+"""
+Mood Statistics
+Vectorized trend, rolling mean, volatility and weekday statistics over a user's mood entries
+"""
+from datetime import timedelta
+import numpy as np
+from .models import MoodEntry
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Change in average mood between the two halves of a window that counts as a trend
+TREND_THRESHOLD = 0.3
+
+
+def load_mood_arrays(user, start_date, end_date):
+    """
+    Fetch a user's entries in the window as two aligned arrays with one query.
+
+    Returns ``(offsets, moods)`` where ``offsets`` is the day index of each
+    entry relative to ``start_date``.
+    """
+    rows = MoodEntry.objects.filter(
+        user=user, local_day__gte=start_date, local_day__lte=end_date
+    ).order_by().values_list('local_day', 'mood')
+    data = np.array(list(rows), dtype=[('day', 'datetime64[D]'), ('mood', 'f8')])
+    offsets = (data['day'] - np.datetime64(start_date, 'D')).astype(np.int64)
+    return offsets, data['mood']
+
+
+class MoodStats:
+    """
+    Statistics over entries bucketed into the days of a window.
+
+    Every figure is computed from per-day sums and counts built with a
+    single ``np.bincount`` pass, so cost is linear in the number of entries
+    and independent of Python-level loops.
+    """
+
+    def __init__(self, offsets, moods, start_date, days, window=7):
+        self.offsets = offsets
+        self.moods = moods
+        self.start_date = start_date
+        self.days = days
+        self.window = window
+        self.counts = np.bincount(offsets, minlength=days)[:days]
+        self.sums = np.bincount(offsets, weights=moods, minlength=days)[:days]
+
+    @classmethod
+    def for_user(cls, user, start_date, end_date, window=7):
+        offsets, moods = load_mood_arrays(user, start_date, end_date)
+        return cls(offsets, moods, start_date, (end_date - start_date).days + 1, window=window)
+
+    @property
+    def entry_count(self):
+        return len(self.moods)
+
+    def daily_means(self):
+        """Average mood for each day of the window; NaN on days without entries"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 0, self.sums / self.counts, np.nan)
+
+    def trailing_mean(self, days):
+        """Entry-weighted mean over the last ``days`` days of the window; None if empty"""
+        count = self.counts[-days:].sum()
+        return float(self.sums[-days:].sum() / count) if count else None
+
+    def last_offset(self):
+        """Day index of the most recent entry; None if empty"""
+        return int(self.offsets.max()) if self.entry_count else None
+
+    def rolling_means(self):
+        """Entry-weighted mean over the trailing ``window`` days; NaN where empty"""
+        sum_csum = np.concatenate(([0.0], np.cumsum(self.sums)))
+        count_csum = np.concatenate(([0], np.cumsum(self.counts)))
+        ends = np.arange(1, self.days + 1)
+        starts = np.maximum(ends - self.window, 0)
+        window_sums = sum_csum[ends] - sum_csum[starts]
+        window_counts = count_csum[ends] - count_csum[starts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+    def rolling_series(self):
+        """Rolling mean per day, skipping days with no entries in their trailing window"""
+        means = self.rolling_means()
+        return [
+            {'day': self.start_date + timedelta(days=offset), 'avg_mood': round(float(means[offset]), 2)}
+            for offset in np.flatnonzero(~np.isnan(means)).tolist()
+        ]
+
+    def slope(self):
+        """Least-squares change in mood per day; zero without at least two distinct days"""
+        if self.entry_count < 2:
+            return 0.0
+        x = self.offsets - self.offsets.mean()
+        denominator = np.dot(x, x)
+        if not denominator:
+            return 0.0
+        return float(np.dot(x, self.moods - self.moods.mean()) / denominator)
+
+    def volatility(self):
+        """Standard deviation of daily average mood across logged days"""
+        means = self.daily_means()
+        logged = means[~np.isnan(means)]
+        return float(logged.std()) if len(logged) > 1 else 0.0
+
+    def weekday_profile(self):
+        """Average mood and entry count per weekday, Monday first"""
+        # 1970-01-01 was a Thursday, so shifting the epoch day by 3 makes Monday 0
+        start = np.datetime64(self.start_date, 'D').astype(np.int64)
+        weekdays = (start + self.offsets + 3) % 7
+        counts = np.bincount(weekdays, minlength=7)
+        sums = np.bincount(weekdays, weights=self.moods, minlength=7)
+        return [
+            {
+                'day': WEEKDAY_NAMES[i],
+                'avg_mood': round(sums[i] / counts[i], 1) if counts[i] else None,
+                'entry_count': int(counts[i]),
+            }
+            for i in range(7)
+        ]
+
+    def trend(self):
+        """'improving', 'declining' or 'stable' from the fitted slope"""
+        if self.entry_count < 3:
+            return 'stable'
+        # Fitted difference between the mean of the later and earlier half of the logged span
+        span = self.offsets.max() - self.offsets.min()
+        change = self.slope() * span / 2
+        if change > TREND_THRESHOLD:
+            return 'improving'
+        if change < -TREND_THRESHOLD:
+            return 'declining'
+        return 'stable'
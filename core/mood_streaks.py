@@ -0,0 +1,117 @@
+"""
+Mood Logging Streaks
+Maintains MoodStreak in constant time per write, with a single-query recompute fallback
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .models import MoodEntry, MoodStreak
+
+
+def streaks_from_days(days):
+    """
+    Compute (current_streak, longest_streak, last_logged_date) from dates.
+
+    ``days`` may be in any order and contain duplicates. The current streak
+    is the run of consecutive days ending at the most recent date.
+    """
+    ordered = sorted(set(days))
+    if not ordered:
+        return 0, 0, None
+
+    longest = run = 1
+    for previous, day in zip(ordered, ordered[1:]):
+        run = run + 1 if day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+    return run, longest, ordered[-1]
+
+
+def logged_days(user_id):
+    """Distinct local days a user logged a mood on, fetched in one query"""
+    return MoodEntry.objects.filter(user_id=user_id).order_by(
+        'local_day'
+    ).values_list('local_day', flat=True).distinct()
+
+
+def recompute_streak(user_id):
+    """Rebuild a user's streak from their full logging history"""
+    current, longest, last_day = streaks_from_days(logged_days(user_id))
+    streak, _ = MoodStreak.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'current_streak': current,
+            'longest_streak': longest,
+            'last_logged_date': last_day,
+        },
+    )
+    return streak
+
+
+def recompute_streaks(user_ids):
+    """Rebuild streaks for many users from one query over their logged days"""
+    days_by_user = {user_id: [] for user_id in user_ids}
+    for user_id, day in MoodEntry.objects.filter(
+        user_id__in=days_by_user
+    ).order_by().values_list('user_id', 'local_day').distinct():
+        days_by_user[user_id].append(day)
+
+    existing = {
+        streak.user_id: streak
+        for streak in MoodStreak.objects.filter(user_id__in=days_by_user)
+    }
+    now = timezone.now()
+    to_update, to_create = [], []
+    for user_id, days in days_by_user.items():
+        current, longest, last_day = streaks_from_days(days)
+        streak = existing.get(user_id)
+        if streak is None:
+            to_create.append(MoodStreak(
+                user_id=user_id,
+                current_streak=current,
+                longest_streak=longest,
+                last_logged_date=last_day,
+            ))
+        else:
+            streak.current_streak = current
+            streak.longest_streak = longest
+            streak.last_logged_date = last_day
+            streak.updated_at = now
+            to_update.append(streak)
+
+    MoodStreak.objects.bulk_create(to_create)
+    MoodStreak.objects.bulk_update(
+        to_update, ['current_streak', 'longest_streak', 'last_logged_date', 'updated_at']
+    )
+
+
+def record_logged_day(user_id, day):
+    """
+    Advance a user's streak for a newly logged day.
+
+    Logging today or the day after the last logged date is O(1). A day
+    earlier than the last logged date may join two runs, so it falls back
+    to a full recompute.
+    """
+    with transaction.atomic():
+        streak, _ = MoodStreak.objects.select_for_update().get_or_create(user_id=user_id)
+        last_day = streak.last_logged_date
+
+        if last_day is not None and day < last_day:
+            return recompute_streak(user_id)
+        if last_day == day:
+            return streak
+
+        if last_day is not None and day - last_day == timedelta(days=1):
+            streak.current_streak += 1
+        else:
+            streak.current_streak = 1
+        streak.last_logged_date = day
+        streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+        streak.save()
+        return streak
+
+
+def current_streak(user):
+    """Current streak for display, read from the stored streak row"""
+    streak = MoodStreak.objects.filter(user=user).first()
+    return streak.streak_on(timezone.localdate()) if streak else 0
@@ -8,7 +8,10 @@ from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from datetime import datetime, timedelta
 import random
-from .models import MoodEntry
+from .models import MoodEntry, MoodDailyRollup
+from . import mood_streaks
+from .mood_cache import has_logged_today
+from .mood_rollups import rollup_totals
 
 
 # Encouragement messages for low mood
@@ -55,16 +58,9 @@ def check_mood_logged_today(request):
             'mood_logged': True  # Always return True for admins to prevent popup
         })
     
-    today = timezone.now().date()
-    
-    # Check if user already logged mood today
-    mood_logged = MoodEntry.objects.filter(
-        user=request.user,
-        date=today
-    ).exists()
-    
+    # Answered from the per-day cache flag; writes keep it current
     return JsonResponse({
-        'mood_logged': mood_logged
+        'mood_logged': has_logged_today(request.user)
     })
 
 
@@ -89,26 +85,25 @@ def log_mood(request):
                 'message': 'Invalid mood level'
             })
         
-        today = timezone.now().date()
+        today = timezone.localdate()
         
         # Check if already logged today
         existing_entry = MoodEntry.objects.filter(
             user=request.user,
-            date=today
+            local_day=today
         ).first()
         
         if existing_entry:
             # Update existing entry
-            existing_entry.mood_level = mood_level
+            existing_entry.mood = mood_level
             existing_entry.notes = notes
             existing_entry.save()
         else:
             # Create new entry
             MoodEntry.objects.create(
                 user=request.user,
-                mood_level=mood_level,
-                notes=notes,
-                date=today
+                mood=mood_level,
+                notes=notes
             )
         
         # Generate personalized response based on mood level
@@ -161,23 +156,18 @@ def log_mood(request):
 @login_required
 def get_mood_stats(request):
     """Get user's mood statistics for display"""
-    # Get last 30 days of mood entries
-    thirty_days_ago = timezone.now().date() - timedelta(days=30)
+    # Last 30 days of mood entries, summed from the daily rollups
+    thirty_days_ago = timezone.localdate() - timedelta(days=30)
     
-    mood_entries = MoodEntry.objects.filter(
+    total_entries, avg_mood = rollup_totals(MoodDailyRollup.objects.filter(
         user=request.user,
-        date__gte=thirty_days_ago
-    ).order_by('-date')
+        day__gte=thirty_days_ago
+    ))
     
-    if mood_entries.exists():
-        avg_mood = sum(entry.mood_level for entry in mood_entries) / mood_entries.count()
-        streak = calculate_streak(request.user)
-    else:
-        avg_mood = 0
-        streak = 0
+    streak = calculate_streak(request.user) if total_entries else 0
     
     return JsonResponse({
-        'total_entries': mood_entries.count(),
+        'total_entries': total_entries,
         'average_mood': round(avg_mood, 1),
         'current_streak': streak
     })
@@ -185,16 +175,4 @@ def get_mood_stats(request):
 
 def calculate_streak(user):
     """Calculate user's current streak of consecutive days logging mood"""
-    today = timezone.now().date()
-    streak = 0
-    
-    current_date = today
-    while True:
-        if MoodEntry.objects.filter(user=user, date=current_date).exists():
-            streak += 1
-            current_date -= timedelta(days=1)
-        else:
-            break
-    
-    return streak
-
+    return mood_streaks.current_streak(user)
\ No newline at end of file
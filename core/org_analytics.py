@@ -0,0 +1,47 @@
+"""
+Organization Analytics
+Platform-wide assessment volume, type and severity breakdowns computed with database aggregation
+"""
+from django.core.cache import cache
+from django.db.models import Count
+from .time_series import count_series
+
+ANALYTICS_CACHE_KEY = 'org_assessment_analytics:{months}'
+ANALYTICS_CACHE_TIMEOUT = 5 * 60
+
+
+def assessment_analytics(months=12):
+    """
+    Compute the organization analytics with three grouped queries.
+
+    Monthly counts are bucketed by calendar month in the current timezone
+    and zero-filled, newest month first.
+    """
+    from screening.models import UserAssessment, AssessmentResult
+
+    completed = UserAssessment.objects.filter(is_completed=True)
+    monthly = count_series(completed, 'completed_at', 'month', months)
+
+    assessment_types = dict(
+        completed.values_list('assessment__name').annotate(count=Count('id')).order_by('assessment__name')
+    )
+    severity_levels = dict(
+        AssessmentResult.objects.filter(user_assessment__is_completed=True)
+        .values_list('severity_level').annotate(count=Count('id')).order_by('severity_level')
+    )
+    return {
+        'monthly_assessments': {
+            start.strftime('%Y-%m'): count for start, count in reversed(monthly.items())
+        },
+        'assessment_types': assessment_types,
+        'severity_levels': severity_levels,
+    }
+
+
+def cached_assessment_analytics(months=12):
+    """Serve the analytics from the cache for a few minutes"""
+    return cache.get_or_set(
+        ANALYTICS_CACHE_KEY.format(months=months),
+        lambda: assessment_analytics(months),
+        ANALYTICS_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,91 @@
+"""
+Platform Stats Snapshots
+Admin dashboard counts computed in a few grouped queries and stored as PlatformStatsSnapshot rows
+"""
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import MoodEntry, Organization, PlatformStatsSnapshot, User
+from .time_series import count_series
+
+# Snapshots are kept this long for history, then pruned on refresh
+RETENTION_DAYS = 30
+
+
+def compute_platform_stats():
+    """Every count shown on the admin dashboard and analytics pages, as JSON-serializable data"""
+    from screening.models import UserAssessment, AssessmentResult
+
+    thirty_days_ago = timezone.now() - timedelta(days=30)
+    users = User.objects.aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(is_active=True)),
+        regular_users=Count('id', filter=Q(role='user')),
+        recent_users=Count('id', filter=Q(created_at__gte=thirty_days_ago)),
+    )
+    organizations = Organization.objects.aggregate(
+        total_organizations=Count('id'),
+        verified_organizations=Count('id', filter=Q(is_verified=True)),
+        unverified_organizations=Count('id', filter=Q(is_verified=False)),
+    )
+    assessments = UserAssessment.objects.filter(is_completed=True).aggregate(
+        total_assessments=Count('id'),
+        recent_assessments=Count('id', filter=Q(completed_at__gte=thirty_days_ago)),
+    )
+    moods = MoodEntry.objects.distribution()
+    monthly_users = count_series(User.objects.all(), 'created_at', 'month', 12)
+
+    # Breakdowns are stored as ordered [key, count] pairs since JSON objects may not keep key order
+    return {
+        **users,
+        **organizations,
+        **assessments,
+        'total_mood_entries': moods['total'],
+        'recent_mood_entries': MoodEntry.objects.filter(date__gte=thirty_days_ago).count(),
+        'average_mood': round(moods['avg_mood'], 2),
+        'assessment_types': list(
+            UserAssessment.objects.filter(is_completed=True).values_list('assessment__name')
+            .annotate(count=Count('id')).order_by('-count')
+        ),
+        'severity_distribution': list(
+            AssessmentResult.objects.values_list('severity_level')
+            .annotate(count=Count('id')).order_by('severity_level')
+        ),
+        'org_types': list(
+            Organization.objects.values_list('organization_type')
+            .annotate(count=Count('id')).order_by('-count')
+        ),
+        # Oldest month first, keyed by ISO month start
+        'monthly_users': [[month.isoformat(), count] for month, count in monthly_users.items()],
+    }
+
+
+def refresh_platform_stats():
+    """Compute and store a new snapshot, timing the computation, and prune old ones"""
+    started = time.perf_counter()
+    stats = compute_platform_stats()
+    snapshot = PlatformStatsSnapshot.objects.create(
+        stats=stats,
+        computation_ms=(time.perf_counter() - started) * 1000,
+    )
+    PlatformStatsSnapshot.objects.filter(
+        computed_at__lt=snapshot.computed_at - timedelta(days=RETENTION_DAYS)
+    ).delete()
+    return snapshot
+
+
+def latest_snapshot():
+    """
+    The most recent snapshot, with one query.
+
+    Falls back to computing one when none exists or the newest is older
+    than ``PLATFORM_STATS_MAX_AGE`` seconds, so the dashboards stay current
+    even if the scheduled refresh is not running.
+    """
+    snapshot = PlatformStatsSnapshot.objects.first()
+    max_age = getattr(settings, 'PLATFORM_STATS_MAX_AGE', 15 * 60)
+    if snapshot is None or snapshot.computed_at < timezone.now() - timedelta(seconds=max_age):
+        snapshot = refresh_platform_stats()
+    return snapshot
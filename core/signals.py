@@ -0,0 +1,136 @@
+"""
+Signal handlers for the core app
+"""
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import MoodEntry, MoodStreak, User
+from .dashboard_cache import invalidate_dashboards
+from .forum_counters import adjust_post_counts
+from .forum_models import ForumComment, ForumLike, ForumPost
+from .forum_search import index_comment, index_post, index_post_comments, unindex
+from .mood_cache import clear_logged_flag, set_logged_flag
+from .mood_risk import refresh_user_risk
+from .mood_rollups import refresh_rollup
+from .mood_streaks import recompute_streak, record_logged_day
+
+
+@receiver(post_init, sender=MoodEntry)
+def remember_mood_entry_day(sender, instance, **kwargs):
+    """Remember the day an entry was loaded with so moves between days are rolled up"""
+    # Read from __dict__ so a deferred field never triggers a query
+    instance._rollup_day = instance.__dict__.get('local_day') if instance.pk else None
+
+
+@receiver(post_save, sender=MoodEntry)
+def update_mood_aggregates_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    day = instance.local_day
+    refresh_rollup(instance.user_id, day)
+    previous_day = getattr(instance, '_rollup_day', None)
+    if previous_day and previous_day != day:
+        refresh_rollup(instance.user_id, previous_day)
+        clear_logged_flag(instance.user_id, previous_day)
+        # Moving an entry may break a run, so rebuild rather than advance
+        recompute_streak(instance.user_id)
+    elif created:
+        record_logged_day(instance.user_id, day)
+    instance._rollup_day = day
+    set_logged_flag(instance.user_id, day, True)
+    refresh_user_risk(instance.user_id)
+    invalidate_dashboards([instance.user_id])
+
+
+# Users whose delete is cascading through their mood entries in this process
+_deleting_users = set()
+
+
+@receiver(pre_delete, sender=User)
+def start_user_delete(sender, instance, **kwargs):
+    _deleting_users.add(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def finish_user_delete(sender, instance, **kwargs):
+    """The cascade already removed the rollup, streak and risk rows; drop the cached values once"""
+    _deleting_users.discard(instance.pk)
+    clear_logged_flag(instance.pk, timezone.localdate())
+    invalidate_dashboards([instance.pk])
+
+
+@receiver(post_delete, sender=MoodEntry)
+def update_mood_aggregates_on_delete(sender, instance, **kwargs):
+    if instance.user_id in _deleting_users:
+        return
+    refresh_rollup(instance.user_id, instance.local_day)
+    clear_logged_flag(instance.user_id, instance.local_day)
+    if MoodStreak.objects.filter(user_id=instance.user_id).exists():
+        recompute_streak(instance.user_id)
+    refresh_user_risk(instance.user_id)
+    invalidate_dashboards([instance.user_id])
+
+
+@receiver(post_save, sender=ForumLike)
+def count_forum_like(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_post_counts(instance.post_id, likes=1)
+
+
+@receiver(post_delete, sender=ForumLike)
+def uncount_forum_like(sender, instance, **kwargs):
+    adjust_post_counts(instance.post_id, likes=-1)
+
+
+@receiver(post_init, sender=ForumComment)
+def remember_comment_visibility(sender, instance, **kwargs):
+    """Remember whether a loaded comment was visible so hide/unhide adjusts the counter once"""
+    instance._was_visible = not instance.__dict__.get('is_hidden', False) if instance.pk else False
+
+
+@receiver(post_save, sender=ForumComment)
+def count_forum_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    visible = not instance.is_hidden
+    if visible != instance._was_visible:
+        adjust_post_counts(instance.post_id, comments=1 if visible else -1)
+    instance._was_visible = visible
+
+
+@receiver(post_delete, sender=ForumComment)
+def uncount_forum_comment(sender, instance, **kwargs):
+    if instance._was_visible:
+        adjust_post_counts(instance.post_id, comments=-1)
+
+
+@receiver(post_init, sender=ForumPost)
+def remember_post_visibility(sender, instance, **kwargs):
+    """Remember whether a loaded post was hidden so unhiding re-indexes its comments"""
+    instance._was_hidden = instance.__dict__.get('is_hidden', False) if instance.pk else False
+
+
+@receiver(post_save, sender=ForumPost)
+def index_forum_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    index_post(instance)
+    if instance._was_hidden and not instance.is_hidden:
+        index_post_comments(instance.id)
+    instance._was_hidden = instance.is_hidden
+
+
+@receiver(post_delete, sender=ForumPost)
+def unindex_forum_post(sender, instance, **kwargs):
+    unindex('post', instance.id)
+
+
+@receiver(post_save, sender=ForumComment)
+def index_forum_comment(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        index_comment(instance, post_hidden=instance.post.is_hidden)
+
+
+@receiver(post_delete, sender=ForumComment)
+def unindex_forum_comment(sender, instance, **kwargs):
+    unindex('comment', instance.id)
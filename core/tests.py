@@ -1,3 +1,920 @@
+import json
+from datetime import datetime, time, timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .forum_models import ForumComment, ForumLike, ForumPost
+from .models import User, MoodEntry, MoodDailyRollup, MoodStreak, UserMoodRisk, PlatformStatsSnapshot
+from .mood_analytics import MoodAnalyticsEngine
+from .mood_cache import has_logged_today
+from .mood_import import import_mood_stream
+from .mood_risk import refresh_all_risks, users_needing_attention
+from .mood_stats import MoodStats
+from .mood_streaks import current_streak, streaks_from_days
+from .time_series import bucket_starts, count_series
 
-# Create your tests here.
+
+class MoodAnalyticsEngineTests(TestCase):
+    """The admin mood analytics context is built from a constant number of queries"""
+
+    def create_entries(self, user_count, days):
+        now = timezone.now()
+        for i in range(user_count):
+            user = User.objects.create(username=f'user{user_count}_{i}')
+            for day in range(days):
+                MoodEntry.objects.create(user=user, mood=(i + day) % 5 + 1, date=now - timedelta(days=day))
+
+    def count_queries(self, days):
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=days - 1)
+        with CaptureQueriesContext(connection) as ctx:
+            context = MoodAnalyticsEngine(start_date, end_date).build_context()
+        return len(ctx.captured_queries), context
+
+    def test_query_count_is_constant_across_data_sizes(self):
+        self.create_entries(user_count=2, days=3)
+        small_queries, small_context = self.count_queries(days=7)
+
+        self.create_entries(user_count=15, days=20)
+        large_queries, large_context = self.count_queries(days=90)
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertLessEqual(large_queries, 7)
+        self.assertEqual(small_context['total_entries'], 6)
+        self.assertEqual(len(large_context['daily_data']), 90)
+        self.assertEqual(len(large_context['most_active_users']), 10)
+
+    def test_distribution_and_attention(self):
+        sad = User.objects.create(username='sad')
+        happy = User.objects.create(username='happy')
+        MoodEntry.objects.create(user=sad, mood=1, notes='rough day')
+        MoodEntry.objects.create(user=sad, mood=2)
+        MoodEntry.objects.create(user=happy, mood=5)
+
+        today = timezone.now().date()
+        context = MoodAnalyticsEngine(today - timedelta(days=6), today).build_context()
+
+        self.assertEqual(context['total_entries'], 3)
+        self.assertEqual(context['very_sad_count'], 1)
+        self.assertEqual(context['very_happy_count'], 1)
+        self.assertEqual(context['entries_with_notes_count'], 1)
+        self.assertEqual(context['active_users_count'], 2)
+        self.assertEqual([item['user'] for item in context['users_needing_attention']], [sad])
+        self.assertEqual(context['users_needing_attention'][0]['avg_mood'], 1.5)
+
+    def test_attention_list_follows_the_selected_window(self):
+        quiet = User.objects.create(username='quiet')
+        MoodEntry.objects.create(user=quiet, mood=1, date=timezone.now() - timedelta(days=10))
+        today = timezone.localdate()
+
+        week = MoodAnalyticsEngine(today - timedelta(days=6), today).build_context()
+        self.assertEqual(week['users_needing_attention'], [])
+        month = MoodAnalyticsEngine(today - timedelta(days=29), today).build_context()
+        self.assertEqual([item['user'] for item in month['users_needing_attention']], [quiet])
+
+    def test_empty_window(self):
+        today = timezone.now().date()
+        context = MoodAnalyticsEngine(today, today).build_context()
+        self.assertEqual(context['total_entries'], 0)
+        self.assertEqual(context['users_needing_attention'], [])
+
+
+class MoodDailyRollupTests(TestCase):
+    """Rollups follow mood entry writes and can be rebuilt from raw entries"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='roller')
+
+    def get_rollup(self, day):
+        return MoodDailyRollup.objects.get(user=self.user, day=day)
+
+    def test_rollup_tracks_create_update_and_delete(self):
+        today = timezone.localdate()
+        first = MoodEntry.objects.create(user=self.user, mood=2)
+        MoodEntry.objects.create(user=self.user, mood=4)
+
+        rollup = self.get_rollup(today)
+        self.assertEqual((rollup.entry_count, rollup.mood_sum, rollup.mood_min, rollup.mood_max), (2, 6, 2, 4))
+
+        first.mood = 5
+        first.save()
+        rollup = self.get_rollup(today)
+        self.assertEqual((rollup.mood_sum, rollup.mood_min, rollup.mood_max), (9, 4, 5))
+
+        first.date = timezone.now() - timedelta(days=1)
+        first.save()
+        self.assertEqual(self.get_rollup(today).entry_count, 1)
+        self.assertEqual(self.get_rollup(today - timedelta(days=1)).entry_count, 1)
+
+        first.delete()
+        self.assertFalse(MoodDailyRollup.objects.filter(day=today - timedelta(days=1)).exists())
+
+    def test_rebuild_matches_incremental_rollups(self):
+        now = timezone.now()
+        for day in range(5):
+            MoodEntry.objects.create(user=self.user, mood=day % 5 + 1, date=now - timedelta(days=day))
+            MoodEntry.objects.create(user=self.user, mood=3, date=now - timedelta(days=day))
+        expected = list(MoodDailyRollup.objects.values_list('day', 'entry_count', 'mood_sum', 'mood_min', 'mood_max'))
+
+        MoodDailyRollup.objects.all().delete()
+        call_command('backfill_mood_rollups', stdout=StringIO())
+
+        rebuilt = list(MoodDailyRollup.objects.values_list('day', 'entry_count', 'mood_sum', 'mood_min', 'mood_max'))
+        self.assertEqual(rebuilt, expected)
+
+
+class MoodStreakTests(TestCase):
+    """Streaks are advanced per write and match the single-query recompute"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='streaker')
+        self.now = timezone.now()
+
+    def log(self, days_ago):
+        return MoodEntry.objects.create(user=self.user, mood=3, date=self.now - timedelta(days=days_ago))
+
+    def test_streaks_from_days(self):
+        today = timezone.localdate()
+        days = [today - timedelta(days=n) for n in (0, 1, 1, 2, 5, 6, 7, 8)]
+        self.assertEqual(streaks_from_days(days), (3, 4, today))
+        self.assertEqual(streaks_from_days([]), (0, 0, None))
+
+    def test_streak_advances_and_resets(self):
+        for days_ago in (3, 2, 1, 0):
+            self.log(days_ago)
+        streak = MoodStreak.objects.get(user=self.user)
+        self.assertEqual((streak.current_streak, streak.longest_streak), (4, 4))
+        self.assertEqual(current_streak(self.user), 4)
+
+    def test_backdated_and_deleted_entries_recompute(self):
+        self.log(0)
+        self.log(2)
+        self.assertEqual(current_streak(self.user), 1)
+        gap = self.log(1)
+        self.assertEqual(current_streak(self.user), 3)
+        gap.delete()
+        streak = MoodStreak.objects.get(user=self.user)
+        self.assertEqual((streak.current_streak, streak.longest_streak), (1, 1))
+
+    def test_backfill_recomputes_in_batches(self):
+        def backfill(user_count):
+            for i in range(user_count):
+                user = User.objects.create(username=f'backfill{user_count}_{i}')
+                MoodEntry.objects.create(user=user, mood=3, date=timezone.now() - timedelta(days=i))
+            MoodStreak.objects.all().delete()
+            with CaptureQueriesContext(connection) as ctx:
+                call_command('backfill_mood_streaks', batch_size=50, stdout=StringIO())
+            return len(ctx.captured_queries)
+
+        self.assertEqual(backfill(3), backfill(30))
+        out = StringIO()
+        call_command('backfill_mood_streaks', verify=True, stdout=out)
+        self.assertIn('streaks are up to date', out.getvalue())
+
+    def test_reading_streak_is_a_single_query(self):
+        for days_ago in range(30):
+            self.log(days_ago)
+        with self.assertNumQueries(1):
+            self.assertEqual(current_streak(self.user), 30)
+
+
+class MoodTrackerPopupTests(TestCase):
+    """The popup endpoints look entries up by their stored local day"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='popup')
+        self.client.force_login(self.user)
+
+    def test_local_day_is_set_on_save(self):
+        entry = MoodEntry.objects.create(user=self.user, mood=4, date=timezone.now() - timedelta(days=3))
+        self.assertEqual(entry.local_day, timezone.localdate(entry.date))
+
+    def test_log_mood_updates_todays_entry(self):
+        url = reverse('core:log_mood_popup')
+        self.assertTrue(self.client.post(url, {'mood_level': 2}).json()['success'])
+        self.assertTrue(self.client.post(url, {'mood_level': 5, 'notes': 'better'}).json()['success'])
+
+        entry = MoodEntry.objects.get(user=self.user)
+        self.assertEqual((entry.mood, entry.notes, entry.local_day), (5, 'better', timezone.localdate()))
+
+        response = self.client.get(reverse('core:check_mood_logged'))
+        self.assertTrue(response.json()['mood_logged'])
+
+    def test_logged_today_flag_is_served_from_cache(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(has_logged_today(self.user))
+        with self.assertNumQueries(0):
+            self.assertFalse(has_logged_today(self.user))
+
+        entry = MoodEntry.objects.create(user=self.user, mood=3)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_logged_today(self.user))
+
+        entry.delete()
+        self.assertFalse(has_logged_today(self.user))
+
+    def test_deleting_a_user_skips_per_entry_refreshes(self):
+        def delete_user_with(entry_count):
+            user = User.objects.create(username=f'leaving{entry_count}')
+            for day in range(entry_count):
+                MoodEntry.objects.create(user=user, mood=2, date=timezone.now() - timedelta(days=day))
+            self.assertTrue(has_logged_today(user))
+            with CaptureQueriesContext(connection) as ctx:
+                user.delete()
+            self.assertIsNone(cache.get(f'mood_logged:{user.pk}:{timezone.localdate().isoformat()}'))
+            return len(ctx.captured_queries)
+
+        self.assertEqual(delete_user_with(2), delete_user_with(40))
+        self.assertFalse(MoodDailyRollup.objects.filter(user__username__startswith='leaving').exists())
+        self.assertFalse(MoodStreak.objects.filter(user__username__startswith='leaving').exists())
+        self.assertFalse(UserMoodRisk.objects.filter(user__username__startswith='leaving').exists())
+
+
+class MoodImportTests(TestCase):
+    """Bulk import validates, deduplicates and refreshes derived tables per batch"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='importer')
+        self.today = timezone.localdate()
+
+    def ndjson_lines(self, days):
+        return [
+            '{"user": "importer", "mood": %d, "timestamp": "%s"}' % (day % 5 + 1, self.today - timedelta(days=day))
+            for day in days
+        ]
+
+    def test_ndjson_import_updates_rollups_and_streaks(self):
+        lines = self.ndjson_lines(range(4)) + ['not json', '{"user": "nobody", "mood": 3, "timestamp": "2024-01-01"}']
+        summary = import_mood_stream(lines, 'ndjson', batch_size=2)
+
+        self.assertEqual((summary['created'], summary['duplicates'], summary['error_count']), (4, 0, 2))
+        self.assertEqual(
+            sorted(MoodEntry.objects.values_list('local_day', flat=True)),
+            [self.today - timedelta(days=day) for day in (3, 2, 1, 0)],
+        )
+        self.assertEqual(MoodDailyRollup.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(current_streak(self.user), 4)
+        self.assertTrue(has_logged_today(self.user))
+
+    def test_duplicates_are_skipped_within_and_across_imports(self):
+        MoodEntry.objects.create(user=self.user, mood=3)
+        lines = [
+            'user,user_id,mood,notes,timestamp',
+            f'importer,,2,first,{self.today - timedelta(days=1)}',
+            f'importer,,5,second,{self.today - timedelta(days=1)}',
+            f',{self.user.pk},4,,{self.today}',
+        ]
+        summary = import_mood_stream(lines, 'csv')
+
+        self.assertEqual((summary['created'], summary['duplicates'], summary['error_count']), (1, 2, 0))
+        self.assertEqual(MoodEntry.objects.get(local_day=self.today - timedelta(days=1)).notes, 'first')
+        self.assertEqual(MoodStreak.objects.get(user=self.user).current_streak, 2)
+
+    def test_queries_per_batch_do_not_grow_with_batch_size(self):
+        def import_queries(days):
+            MoodEntry.objects.all().delete()
+            with CaptureQueriesContext(connection) as ctx:
+                import_mood_stream(self.ndjson_lines(days), 'ndjson', batch_size=100)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(import_queries(range(3)), import_queries(range(30)))
+
+    def test_imported_low_moods_reach_the_attention_list(self):
+        other = User.objects.create(username='bystander')
+        MoodEntry.objects.create(user=other, mood=5)
+        lines = [
+            '{"user": "importer", "mood": 1, "timestamp": "%s"}' % (self.today - timedelta(days=day))
+            for day in range(5)
+        ]
+        import_mood_stream(lines, 'ndjson', batch_size=2)
+
+        risk = UserMoodRisk.objects.get(user=self.user)
+        self.assertEqual((risk.avg_30d, risk.entries_30d), (1.0, 5))
+        self.assertEqual([risk.user for risk in users_needing_attention()], [self.user])
+        self.assertTrue(UserMoodRisk.objects.filter(user=other).exists())
+
+    def test_impossible_date_is_reported_as_row_error(self):
+        lines = self.ndjson_lines(range(1)) + ['{"user": "importer", "mood": 3, "timestamp": "2024-02-30"}']
+        summary = import_mood_stream(lines, 'ndjson')
+
+        self.assertEqual((summary['created'], summary['error_count']), (1, 1))
+        self.assertEqual(summary['errors'][0], {'line': 2, 'error': "Invalid timestamp: '2024-02-30'"})
+
+    def test_non_string_timestamp_is_reported_as_row_error(self):
+        lines = ['{"user": "importer", "mood": 3, "timestamp": 1700000000}'] + self.ndjson_lines(range(1))
+        summary = import_mood_stream(lines, 'ndjson')
+
+        self.assertEqual((summary['created'], summary['error_count']), (1, 1))
+        self.assertEqual(summary['errors'][0], {'line': 1, 'error': "Invalid timestamp: '1700000000'"})
+
+    def test_admin_endpoint_accepts_request_body(self):
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_login(admin)
+        response = self.client.post(
+            reverse('core:admin_mood_import'),
+            data='\n'.join(self.ndjson_lines(range(2))),
+            content_type='application/x-ndjson',
+        )
+        self.assertEqual(response.json()['created'], 2)
+
+
+class MoodExportTests(TestCase):
+    """Exports stream entries in the format the importer reads back"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='exporter')
+        self.now = timezone.now()
+        for day in range(3):
+            MoodEntry.objects.create(user=self.user, mood=day + 2, notes=f'day {day}', date=self.now - timedelta(days=day))
+
+    def test_user_csv_export_round_trips_through_import(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:export_mood_history'), {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(lines[0], 'user,mood,notes,timestamp')
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith('exporter,4,day 2,'))
+
+        MoodEntry.objects.all().delete()
+        summary = import_mood_stream(lines, 'csv')
+        self.assertEqual(summary['created'], 3)
+
+    def test_admin_ndjson_export_filters_by_date_range(self):
+        other = User.objects.create(username='other')
+        MoodEntry.objects.create(user=other, mood=1)
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_login(admin)
+
+        today = timezone.localdate()
+        response = self.client.get(reverse('core:admin_mood_export'), {
+            'format': 'ndjson',
+            'start': today - timedelta(days=1),
+            'end': today,
+        })
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(sorted(record['user'] for record in records), ['exporter', 'exporter', 'other'])
+
+    def test_admin_export_rejects_impossible_dates(self):
+        self.client.force_login(User.objects.create(username='admin', is_staff=True))
+        response = self.client.get(reverse('core:admin_mood_export'), {'start': '2024-02-30'})
+        self.assertEqual(response.status_code, 400)
+
+
+class MoodStatsTests(TestCase):
+    """Vectorized statistics agree with their straightforward definitions"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='stats')
+        self.end = timezone.localdate()
+        self.start = self.end - timedelta(days=13)
+
+    def log(self, offset, mood):
+        day = self.start + timedelta(days=offset)
+        MoodEntry.objects.create(user=self.user, mood=mood, date=timezone.make_aware(datetime.combine(day, time(12))))
+
+    def test_rising_mood_is_improving(self):
+        for offset in range(14):
+            self.log(offset, 1 + offset * 4 // 13)
+        stats = MoodStats.for_user(self.user, self.start, self.end)
+
+        self.assertEqual(stats.trend(), 'improving')
+        self.assertGreater(stats.slope(), 0)
+        self.assertAlmostEqual(stats.rolling_means()[2], (1 + 1 + 1) / 3)
+        self.assertEqual(sum(day['entry_count'] for day in stats.weekday_profile()), 14)
+        self.assertEqual(stats.weekday_profile()[self.start.weekday()]['entry_count'], 2)
+
+    def test_daily_means_and_volatility(self):
+        self.log(0, 2)
+        self.log(0, 4)
+        self.log(5, 5)
+        stats = MoodStats.for_user(self.user, self.start, self.end)
+
+        means = stats.daily_means()
+        self.assertEqual((means[0], means[5]), (3.0, 5.0))
+        self.assertEqual(stats.volatility(), 1.0)
+
+    def test_summary_view_renders_year_window(self):
+        self.log(0, 3)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:mood_history_summary'), {'days': 365})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['weekday_profile']), 7)
+
+    def test_summary_view_shows_rolling_average(self):
+        self.log(10, 2)
+        self.log(12, 4)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:mood_history_summary'), {'days': 14})
+
+        rolling = response.context['rolling_mood']
+        self.assertEqual([point['day'] for point in rolling], [self.start + timedelta(days=n) for n in range(10, 14)])
+        self.assertEqual([point['avg_mood'] for point in rolling], [2.0, 2.0, 3.0, 3.0])
+        self.assertContains(response, '7-Day Rolling Average')
+
+
+class MoodDistributionTests(TestCase):
+    """MoodEntry.objects.distribution() replaces the per-level count queries"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='distributed')
+        for mood, notes in [(5, 'great'), (5, ''), (4, ''), (2, 'rough'), (1, '')]:
+            MoodEntry.objects.create(user=self.user, mood=mood, notes=notes)
+
+    def test_distribution_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            stats = MoodEntry.objects.filter(user=self.user).distribution()
+        self.assertEqual(stats, {
+            'total': 5, 'avg_mood': 3.4, 'with_notes': 2,
+            'very_happy': 2, 'happy': 1, 'neutral': 0, 'sad': 1, 'very_sad': 1,
+        })
+
+    def test_empty_distribution(self):
+        stats = MoodEntry.objects.none().distribution()
+        self.assertEqual((stats['total'], stats['avg_mood']), (0, 0))
+
+    def test_summary_view_query_count(self):
+        self.client.force_login(self.user)
+        url = reverse('core:mood_history_summary')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.context['very_happy_count'], 2)
+        self.assertEqual(response.context['entries_with_notes_count'], 2)
+        aggregate_queries = [q for q in ctx.captured_queries if 'COUNT(' in q['sql']]
+        self.assertEqual(len(aggregate_queries), 1)
+
+
+class UserMoodRiskTests(TestCase):
+    """Risk rows follow mood writes and the nightly rebuild produces the same result"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.sad = User.objects.create(username='low')
+        self.happy = User.objects.create(username='high')
+        for day in range(10):
+            MoodEntry.objects.create(user=self.sad, mood=1 + day % 2, date=self.now - timedelta(days=day))
+            MoodEntry.objects.create(user=self.happy, mood=5, date=self.now - timedelta(days=day))
+
+    def risk_rows(self):
+        return list(UserMoodRisk.objects.order_by('user_id').values_list(
+            'user_id', 'avg_7d', 'avg_30d', 'entries_30d', 'slope_30d', 'risk_score', 'needs_attention', 'last_entry_date'
+        ))
+
+    def test_risk_is_maintained_on_write(self):
+        risk = UserMoodRisk.objects.get(user=self.sad)
+        self.assertTrue(risk.needs_attention)
+        self.assertEqual((risk.avg_30d, risk.entries_30d), (1.5, 10))
+        self.assertFalse(UserMoodRisk.objects.get(user=self.happy).needs_attention)
+
+        MoodEntry.objects.filter(user=self.sad).delete()
+        self.assertFalse(UserMoodRisk.objects.filter(user=self.sad).exists())
+
+    def test_nightly_refresh_matches_incremental_rows(self):
+        expected = self.risk_rows()
+        UserMoodRisk.objects.all().delete()
+        call_command('refresh_mood_risk', stdout=StringIO())
+        self.assertEqual(self.risk_rows(), expected)
+
+        # Users whose entries have all aged out of the window are dropped
+        MoodEntry.objects.filter(user=self.happy).update(local_day=timezone.localdate() - timedelta(days=60))
+        self.assertEqual(refresh_all_risks(), 1)
+        self.assertFalse(UserMoodRisk.objects.filter(user=self.happy).exists())
+
+    def test_attention_list_is_one_query(self):
+        User.objects.filter(pk=self.happy.pk).update(is_staff=True)
+        with self.assertNumQueries(1):
+            risks = users_needing_attention()
+            self.assertEqual([risk.user.username for risk in risks], ['low'])
+
+
+class DashboardSummaryCacheTests(TestCase):
+    """The dashboard is served from a cached summary invalidated by writes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='dashboard')
+        self.client.force_login(self.user)
+        from screening.models import Assessment
+        self.assessment = Assessment.objects.create(name='phq9', title='PHQ-9', description='', instructions='')
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in ctx.captured_queries]
+
+    def test_warm_dashboard_needs_no_summary_queries(self):
+        MoodEntry.objects.create(user=self.user, mood=4)
+        self.get_dashboard()
+        response, queries = self.get_dashboard()
+        # Only the session and the authenticated user are loaded
+        self.assertEqual(len([sql for sql in queries if 'django_session' not in sql]), 1)
+        self.assertEqual(len(response.context['recent_moods']), 1)
+
+    def test_writes_invalidate_the_summary(self):
+        from screening.models import UserAssessment, AssessmentResult
+        self.assertEqual(len(self.get_dashboard()[0].context['recent_moods']), 0)
+
+        MoodEntry.objects.create(user=self.user, mood=2)
+        response, _ = self.get_dashboard()
+        self.assertEqual(response.context['mood_avg_week'], 2)
+
+        user_assessment = UserAssessment.objects.create(
+            user=self.user, assessment=self.assessment, total_score=22, is_completed=True
+        )
+        response, _ = self.get_dashboard()
+        self.assertEqual(response.context['phq9_count'], 1)
+        self.assertFalse(response.context['needs_attention'])
+
+        AssessmentResult.objects.create(
+            user_assessment=user_assessment, severity_level='severe', score_range='22', recommendation=''
+        )
+        self.assertTrue(self.get_dashboard()[0].context['needs_attention'])
+
+
+class OrganizationAnalyticsTests(TestCase):
+    """Organization analytics are aggregated in the database by calendar month"""
+
+    def setUp(self):
+        cache.clear()
+        from screening.models import Assessment
+        self.org_user = User.objects.create(username='clinic', role='organization')
+        self.user = User.objects.create(username='patient')
+        self.phq9 = Assessment.objects.create(name='phq9', title='PHQ-9', description='', instructions='')
+        self.gad7 = Assessment.objects.create(name='gad7', title='GAD-7', description='', instructions='')
+        self.client.force_login(self.org_user)
+
+    def complete(self, assessment, completed_at, severity='mild'):
+        from screening.models import UserAssessment, AssessmentResult
+        user_assessment = UserAssessment.objects.create(
+            user=self.user, assessment=assessment, total_score=5, is_completed=True, completed_at=completed_at
+        )
+        AssessmentResult.objects.create(
+            user_assessment=user_assessment, severity_level=severity, score_range='5', recommendation=''
+        )
+
+    def test_counts_use_constant_queries_and_calendar_months(self):
+        from .org_analytics import assessment_analytics
+        this_month = bucket_starts(timezone.localdate(), 'month', 3)[::-1]
+        start_of_month = timezone.make_aware(datetime.combine(this_month[0], time(0, 30)))
+        two_months_ago = timezone.make_aware(datetime.combine(this_month[2], time(12)))
+        self.complete(self.phq9, start_of_month, severity='severe')
+
+        with CaptureQueriesContext(connection) as few:
+            assessment_analytics()
+        for _ in range(5):
+            self.complete(self.gad7, two_months_ago)
+        with self.assertNumQueries(len(few.captured_queries)):
+            analytics = assessment_analytics()
+
+        monthly = analytics['monthly_assessments']
+        self.assertEqual(len(monthly), 12)
+        self.assertEqual(list(monthly)[0], this_month[0].strftime('%Y-%m'))
+        self.assertEqual(monthly[this_month[0].strftime('%Y-%m')], 1)
+        self.assertEqual(monthly[this_month[1].strftime('%Y-%m')], 0)
+        self.assertEqual(monthly[this_month[2].strftime('%Y-%m')], 5)
+        self.assertEqual(analytics['assessment_types'], {'gad7': 5, 'phq9': 1})
+        self.assertEqual(analytics['severity_levels'], {'mild': 5, 'severe': 1})
+
+    def test_page_is_cached(self):
+        self.complete(self.phq9, timezone.now())
+        response = self.client.get(reverse('core:organization_analytics'))
+        self.assertEqual(response.context['assessment_types'], {'phq9': 1})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('core:organization_analytics'))
+        self.assertFalse([q for q in ctx.captured_queries if 'screening_' in q['sql']])
+
+
+class TimeSeriesTests(TestCase):
+    """Zero-filled calendar buckets come from one grouped query"""
+
+    def test_bucket_starts_follow_the_calendar(self):
+        today = datetime(2025, 2, 14).date()
+        self.assertEqual(
+            [d.isoformat() for d in bucket_starts(today, 'month', 3)],
+            ['2024-12-01', '2025-01-01', '2025-02-01'],
+        )
+        self.assertEqual(
+            [d.isoformat() for d in bucket_starts(today, 'week', 2)],
+            ['2025-02-03', '2025-02-10'],
+        )
+        self.assertEqual(bucket_starts(today, 'day', 2)[0].isoformat(), '2025-02-13')
+        with self.assertRaises(ValueError):
+            bucket_starts(today, 'year', 2)
+
+    def test_count_series_zero_fills_with_one_query(self):
+        user = User.objects.create(username='series')
+        today = timezone.localdate()
+        for days_ago in (0, 1, 1, 8, 30):
+            MoodEntry.objects.create(user=user, mood=3, date=timezone.now() - timedelta(days=days_ago))
+
+        with self.assertNumQueries(1):
+            daily = count_series(MoodEntry.objects.all(), 'local_day', 'day', 7, today=today)
+        self.assertEqual(list(daily.values()), [0, 0, 0, 0, 0, 2, 1])
+
+        with self.assertNumQueries(1):
+            weekly = count_series(MoodEntry.objects.all(), 'date', 'week', 3, today=today)
+        # Three weeks back always reaches 8 days ago and never 30
+        self.assertEqual(sum(weekly.values()), 4)
+        self.assertEqual(list(weekly), bucket_starts(today, 'week', 3))
+
+        monthly = count_series(User.objects.all(), 'created_at', 'month', 12)
+        self.assertEqual(list(monthly.values())[-1], 1)
+        self.assertEqual(sum(monthly.values()), 1)
+
+    def test_admin_views_use_calendar_months(self):
+        admin = User.objects.create(username='series-admin', is_staff=True)
+        self.client.force_login(admin)
+        this_month = timezone.localdate().strftime('%Y-%m')
+
+        monthly = self.client.get(reverse('core:admin_dashboard')).context['monthly_users']
+        self.assertEqual(len(monthly), 12)
+        self.assertEqual(next(iter(monthly.items())), (this_month, 1))
+
+        monthly = self.client.get(reverse('core:admin_analytics')).context['monthly_users']
+        self.assertEqual(len(monthly), 12)
+        self.assertEqual(list(monthly.values())[-1], 1)
+
+
+class PlatformStatsSnapshotTests(TestCase):
+    """Admin dashboards render from the latest stored stats snapshot"""
+
+    def setUp(self):
+        self.admin = User.objects.create(username='stats-admin', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_dashboard_reads_the_latest_snapshot(self):
+        self.client.get(reverse('core:admin_dashboard'))
+        self.assertEqual(PlatformStatsSnapshot.objects.count(), 1)
+        User.objects.create(username='newcomer')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:admin_dashboard'))
+        # Session, user, snapshot and the severe case list
+        self.assertLessEqual(len(ctx.captured_queries), 4)
+        self.assertEqual(response.context['total_users'], 1)
+        self.assertGreaterEqual(response.context['stats_snapshot'].computation_ms, 0)
+
+    def test_refresh_now_recomputes(self):
+        self.client.get(reverse('core:admin_analytics'))
+        User.objects.create(username='newcomer')
+        response = self.client.post(
+            reverse('core:admin_refresh_platform_stats'), {'next': reverse('core:admin_analytics')}
+        )
+        self.assertRedirects(response, reverse('core:admin_analytics'))
+        self.assertEqual(PlatformStatsSnapshot.objects.count(), 2)
+        self.assertEqual(self.client.get(reverse('core:admin_analytics')).context['total_users'], 2)
+
+    def test_stale_snapshot_is_recomputed(self):
+        call_command('refresh_platform_stats', stdout=StringIO())
+        PlatformStatsSnapshot.objects.update(computed_at=timezone.now() - timedelta(hours=1))
+        User.objects.create(username='newcomer')
+        self.assertEqual(self.client.get(reverse('core:admin_dashboard')).context['total_users'], 2)
+
+
+class ForumCounterTests(TestCase):
+    """Like and visible comment counts are stored on the post"""
+
+    def setUp(self):
+        self.author = User.objects.create(username='poster')
+        self.reader = User.objects.create(username='reader')
+        self.post = ForumPost.objects.create(author=self.author, content='Hello')
+        self.client.force_login(self.reader)
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.like_count, self.post.visible_comment_count
+
+    def test_toggle_like_updates_the_counter(self):
+        url = reverse('core:forum_toggle_like', args=[self.post.id])
+        self.assertEqual(self.client.post(url).json()['like_count'], 1)
+        self.assertEqual(self.client.post(url).json()['like_count'], 0)
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_comment_visibility_changes_adjust_the_counter(self):
+        self.client.post(reverse('core:forum_add_comment', args=[self.post.id]), {'content': 'First'})
+        comment = ForumComment.objects.create(post=self.post, author=self.author, content='Second')
+        self.assertEqual(self.counts(), (0, 2))
+
+        comment.is_hidden = True
+        comment.save()
+        comment.save()
+        self.assertEqual(self.counts(), (0, 1))
+
+        comment = ForumComment.objects.get(id=comment.id)
+        comment.delete()
+        self.assertEqual(self.counts(), (0, 1))
+
+        own = ForumComment.objects.get(content='First')
+        self.client.post(reverse('core:forum_delete_comment', args=[own.id]))
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_saving_a_stale_post_keeps_the_counters(self):
+        stale = ForumPost.objects.get(id=self.post.id)
+        ForumLike.objects.create(post=self.post, user=self.reader)
+        ForumComment.objects.create(post=self.post, author=self.reader, content='Reply')
+
+        stale.content = 'Hello again'
+        stale.save()
+        self.client.force_login(self.author)
+        self.client.post(reverse('core:forum_edit_post', args=[self.post.id]), {'content': 'Edited'})
+
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertEqual(self.post.content, 'Edited')
+
+    def test_list_renders_without_aggregate_joins(self):
+        for number in range(5):
+            post = ForumPost.objects.create(author=self.author, content=f'Post {number}')
+            ForumLike.objects.create(post=post, user=self.reader)
+            ForumComment.objects.create(post=post, author=self.reader, content='Reply')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:forum_list'))
+        self.assertContains(response, 'Post 4')
+        forum_queries = [q['sql'] for q in ctx.captured_queries if 'core_forumpost' in q['sql']]
+        self.assertFalse([sql for sql in forum_queries if 'core_forumlike' in sql or 'core_forumcomment' in sql])
+
+    def test_reconcile_fixes_drift(self):
+        ForumLike.objects.create(post=self.post, user=self.reader)
+        ForumComment.objects.create(post=self.post, author=self.reader, content='Reply')
+        ForumPost.objects.filter(id=self.post.id).update(like_count=7, visible_comment_count=0)
+        out = StringIO()
+        call_command('reconcile_forum_counts', stdout=out)
+        self.assertIn('Corrected counters on 1 posts', out.getvalue())
+        self.assertEqual(self.counts(), (1, 1))
+
+
+class ForumFeedTests(TestCase):
+    """The forum feed pages with an opaque (created_at, id) cursor"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='scroller')
+        self.client.force_login(self.user)
+        moment = timezone.now()
+        # Shared timestamps make the id tie-breaker matter
+        self.posts = [
+            ForumPost.objects.create(author=self.user, content=f'Post {n}', created_at=moment - timedelta(minutes=n // 3))
+            for n in range(25)
+        ]
+        ForumPost.objects.create(author=self.user, content='Hidden', is_hidden=True)
+
+    def test_pages_cover_every_visible_post_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:forum_list'))
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT(' in q['sql']])
+        first_page = response.context['posts']
+        self.assertEqual(len(first_page), 20)
+
+        data = self.client.get(reverse('core:forum_feed'), {'cursor': response.context['next_cursor']}).json()
+        self.assertIsNone(data['next_cursor'])
+        self.assertIn('Post', data['posts'][0]['html'])
+        self.assertIn('Anonymous', data['posts'][0]['html'])
+        self.assertNotIn('<<<<<<<', data['posts'][0]['html'])
+
+        seen = [post.id for post in first_page] + [post['id'] for post in data['posts']]
+        expected = sorted(self.posts, key=lambda post: (post.created_at, post.id), reverse=True)
+        self.assertEqual(seen, [post.id for post in expected])
+
+    def test_invalid_cursor_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('core:forum_feed'), {'cursor': 'not-a-cursor'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('core:forum_list'), {'cursor': '!!'}).status_code, 404)
+
+    def test_liked_state_comes_from_one_query(self):
+        other = User.objects.create(username='fan')
+        for post in self.posts[:3]:
+            ForumLike.objects.create(post=post, user=self.user)
+        for post in self.posts:
+            ForumLike.objects.create(post=post, user=other)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:forum_list'))
+        like_queries = [q['sql'] for q in ctx.captured_queries if 'core_forumlike' in q['sql']]
+        self.assertEqual(len(like_queries), 1)
+        liked = {post.id for post in response.context['posts'] if post.is_liked}
+        self.assertEqual(liked, {post.id for post in self.posts[:3]})
+
+        data = self.client.get(reverse('core:forum_feed'), {'cursor': response.context['next_cursor']}).json()
+        self.assertFalse(any(post['is_liked'] for post in data['posts']))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:forum_post_detail', args=[self.posts[0].id]))
+        self.assertTrue(response.context['is_liked'])
+        self.assertEqual(len([q for q in ctx.captured_queries if 'core_forumlike' in q['sql']]), 1)
+
+    def test_comment_preview_is_bounded_per_post(self):
+        from .forum_feed import COMMENT_PREVIEW_SIZE
+        busy, quiet = self.posts[0], self.posts[1]
+        for number in range(COMMENT_PREVIEW_SIZE + 5):
+            ForumComment.objects.create(
+                post=busy, author=self.user, content=f'Reply {number}',
+                created_at=timezone.now() + timedelta(seconds=number),
+            )
+        ForumComment.objects.create(post=busy, author=self.user, content='Hidden reply', is_hidden=True)
+        ForumComment.objects.create(post=quiet, author=self.user, content='Only reply')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:forum_list'))
+        comment_queries = [q['sql'] for q in ctx.captured_queries if 'core_forumcomment' in q['sql']]
+        self.assertEqual(len(comment_queries), 1)
+        self.assertIn('ROW_NUMBER', comment_queries[0])
+
+        posts = {post.id: post for post in response.context['posts']}
+        self.assertEqual(
+            [comment.content for comment in posts[busy.id].latest_comments],
+            [f'Reply {number}' for number in range(5, COMMENT_PREVIEW_SIZE + 5)],
+        )
+        self.assertEqual([c.content for c in posts[quiet.id].latest_comments], ['Only reply'])
+        self.assertContains(response, f'View all {COMMENT_PREVIEW_SIZE + 5} comments')
+
+
+class ForumSearchTests(TestCase):
+    """Forum search reads a full-text index kept in step by signals"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='searcher')
+        self.client.force_login(self.user)
+
+    def search(self, query, **params):
+        return self.client.get(reverse('core:forum_search'), {'q': query, **params})
+
+    def result_ids(self, response):
+        return [post.id for post in response.context['posts']]
+
+    def test_best_match_ranks_first(self):
+        passing = ForumPost.objects.create(author=self.user, content='Some notes on sleep and a long walk today')
+        focused = ForumPost.objects.create(author=self.user, content='Sleep sleep sleep, struggling with sleep')
+        ForumPost.objects.create(author=self.user, content='Nothing relevant here')
+
+        self.assertEqual(self.result_ids(self.search('sleep')), [focused.id, passing.id])
+
+    def test_comment_match_returns_its_post_once(self):
+        post = ForumPost.objects.create(author=self.user, content='Evening routine')
+        ForumComment.objects.create(post=post, author=self.user, content='Journaling helps me unwind')
+        ForumComment.objects.create(post=post, author=self.user, content='Journaling before bed too')
+
+        response = self.search('journaling')
+        self.assertEqual(self.result_ids(response), [post.id])
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+
+    def test_hidden_content_is_excluded_and_restored(self):
+        post = ForumPost.objects.create(author=self.user, content='Breathing exercises')
+        comment = ForumComment.objects.create(post=post, author=self.user, content='Meditation app tips')
+
+        comment.is_hidden = True
+        comment.save()
+        self.assertEqual(self.result_ids(self.search('meditation')), [])
+
+        comment.is_hidden = False
+        comment.save()
+        post.is_hidden = True
+        post.save()
+        self.assertEqual(self.result_ids(self.search('breathing')), [])
+        self.assertEqual(self.result_ids(self.search('meditation')), [])
+
+        post.is_hidden = False
+        post.save()
+        self.assertEqual(self.result_ids(self.search('meditation')), [post.id])
+
+    def test_edits_and_deletes_update_the_index(self):
+        post = ForumPost.objects.create(author=self.user, content='Feeling anxious')
+        post.content = 'Feeling calm'
+        post.save()
+        self.assertEqual(self.result_ids(self.search('anxious')), [])
+        self.assertEqual(self.result_ids(self.search('calm')), [post.id])
+
+        post.delete()
+        self.assertEqual(self.result_ids(self.search('calm')), [])
+
+    def test_results_are_paginated_and_query_syntax_is_escaped(self):
+        for number in range(25):
+            ForumPost.objects.create(author=self.user, content=f'Gratitude list {number}')
+
+        first = self.search('gratitude')
+        self.assertEqual(len(first.context['posts']), 20)
+        self.assertEqual(first.context['page_obj'].paginator.num_pages, 2)
+        second = self.search('gratitude', page=2)
+        self.assertEqual(len(second.context['posts']), 5)
+        self.assertFalse(set(self.result_ids(first)) & set(self.result_ids(second)))
+
+        self.assertEqual(self.search('gratitude" OR NEAR(').status_code, 200)
+        self.assertEqual(self.result_ids(self.search('')), [])
+
+    def test_rebuild_command_restores_the_index(self):
+        post = ForumPost.objects.create(author=self.user, content='Therapy progress')
+        ForumPost.objects.create(author=self.user, content='Therapy hidden', is_hidden=True)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM core_forum_search')
+        self.assertEqual(self.result_ids(self.search('therapy')), [])
+
+        out = StringIO()
+        call_command('rebuild_forum_search', stdout=out)
+        self.assertIn('Indexed 1 forum documents', out.getvalue())
+        self.assertEqual(self.result_ids(self.search('therapy')), [post.id])
@@ -0,0 +1,59 @@
+"""
+Time Series
+Zero-filled daily, weekly or monthly counts for any model and date field from one grouped query
+"""
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+TRUNCATORS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def bucket_starts(today, period, periods):
+    """Start date of each of the last ``periods`` buckets containing ``today``, oldest first"""
+    if period == 'day':
+        starts = [today - timedelta(days=i) for i in range(periods)]
+    elif period == 'week':
+        # Weeks start on Monday, matching TruncWeek
+        monday = today - timedelta(days=today.weekday())
+        starts = [monday - timedelta(weeks=i) for i in range(periods)]
+    elif period == 'month':
+        year, month = today.year, today.month
+        starts = []
+        for _ in range(periods):
+            starts.append(today.replace(year=year, month=month, day=1))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    else:
+        raise ValueError(f'Unsupported period: {period}')
+    return starts[::-1]
+
+
+def count_series(queryset, field, period='month', periods=12, today=None):
+    """
+    Count rows of ``queryset`` per calendar bucket of ``field``.
+
+    Returns an ordered mapping of bucket start date to count, oldest first,
+    with empty buckets filled with zero. Buckets follow the current
+    timezone for datetime fields.
+    """
+    starts = bucket_starts(today or timezone.localdate(), period, periods)
+    is_datetime = queryset.model._meta.get_field(field).get_internal_type() == 'DateTimeField'
+    window_start = timezone.make_aware(datetime.combine(starts[0], time.min)) if is_datetime else starts[0]
+
+    series = OrderedDict((start, 0) for start in starts)
+    rows = queryset.filter(**{f'{field}__gte': window_start}).annotate(
+        bucket=TRUNCATORS[period](field)
+    ).values('bucket').annotate(count=Count('pk')).order_by()
+    for row in rows:
+        bucket = row['bucket']
+        if isinstance(bucket, datetime):
+            bucket = bucket.date()
+        if bucket in series:
+            series[bucket] = row['count']
+    return series
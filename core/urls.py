@@ -8,6 +8,7 @@ from . import forum_admin_views
 from . import mood_tracker_views
 from . import mood_history_views
 from . import admin_mood_analytics_views
+from . import mood_data_views
 
 app_name = 'core'
 
@@ -22,6 +23,7 @@ urlpatterns = [
     path('profile/', views.ProfileView.as_view(), name='profile'),
     path('mood/add/', views.AddMoodEntryView.as_view(), name='add_mood'),
     path('mood/history/', views.MoodHistoryView.as_view(), name='mood_history'),
+    path('mood/export/', mood_data_views.export_mood_history, name='export_mood_history'),
     path('mood/chart-data/', views.mood_chart_data, name='mood_chart_data'),
     
     # Organization URLs
@@ -52,6 +54,7 @@ urlpatterns = [
     path('system-admin/organizations/<int:org_id>/toggle-verification/', admin_views.admin_toggle_organization_verification, name='admin_toggle_organization_verification'),
     path('system-admin/organizations/quick-actions/', admin_views.admin_organization_quick_actions, name='admin_organization_quick_actions'),
     path('system-admin/analytics/', admin_views.admin_analytics_view, name='admin_analytics'),
+    path('system-admin/stats/refresh/', admin_views.admin_refresh_platform_stats, name='admin_refresh_platform_stats'),
     
     # Assessment Management URLs
     path('system-admin/assessments/', admin_views.AdminAssessmentManagementView.as_view(), name='admin_assessment_management'),
@@ -76,6 +79,8 @@ urlpatterns = [
     
     # Forum URLs
     path('forum/', forum_views.ForumListView.as_view(), name='forum_list'),
+    path('forum/feed/', forum_views.forum_feed, name='forum_feed'),
+    path('forum/search/', forum_views.forum_search, name='forum_search'),
     path('forum/post/<int:post_id>/', forum_views.ForumPostDetailView.as_view(), name='forum_post_detail'),
     path('forum/create/', forum_views.create_post, name='forum_create_post'),
     path('forum/post/<int:post_id>/edit/', forum_views.edit_post, name='forum_edit_post'),
@@ -107,4 +112,6 @@ urlpatterns = [
     
     # Admin Mood Analytics
     path('system-admin/mood-analytics/', admin_mood_analytics_views.admin_mood_analytics, name='admin_mood_analytics'),
+    path('system-admin/mood-import/', mood_data_views.admin_mood_import, name='admin_mood_import'),
+    path('system-admin/mood-export/', mood_data_views.admin_mood_export, name='admin_mood_export'),
 ]
\ No newline at end of file
@@ -4,7 +4,7 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView, CreateView, ListView, UpdateView, DeleteView
 from django.contrib import messages
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.urls import reverse_lazy
 from django.http import JsonResponse
@@ -14,6 +14,9 @@ from django.core.paginator import Paginator
 from datetime import timedelta
 from .models import User, MoodEntry, Organization, OrganizationStaff, PatientCase, OrganizationAppointment, OrganizationAlert
 from .forms import CustomUserCreationForm, MoodEntryForm, UserProfileForm, OrganizationRegistrationForm, OrganizationProfileForm
+from .dashboard_cache import get_dashboard_summary
+from .org_analytics import cached_assessment_analytics
+from . import mood_risk
 
 class LandingPageView(TemplateView):
     template_name = 'core/landing.html'
@@ -53,33 +56,9 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        from screening.models import UserAssessment, AssessmentResult
-        
-        context['recent_moods'] = MoodEntry.objects.filter(user=user)[:7]
-        
-        week_ago = timezone.now() - timedelta(days=7)
-        context['mood_avg_week'] = MoodEntry.objects.filter(
-            user=user, date__gte=week_ago
-        ).aggregate(avg_mood=Avg('mood'))['avg_mood'] or 0
-        
-        completed_assessments = UserAssessment.objects.filter(user=user, is_completed=True)
-        context['assessments_taken'] = completed_assessments.count()
-        context['recent_assessment'] = completed_assessments.first()
-        
-        context['phq9_count'] = completed_assessments.filter(assessment__name='phq9').count()
-        context['gad7_count'] = completed_assessments.filter(assessment__name='gad7').count()
-        context['pss_count'] = completed_assessments.filter(assessment__name='pss').count()
-        
-        latest_results = AssessmentResult.objects.filter(
-            user_assessment__user=user,
-            user_assessment__is_completed=True
-        ).order_by('-created_at')[:3]
-        
-        context['latest_results'] = latest_results
-        context['needs_attention'] = any(
-            result.severity_level in ['moderately_severe', 'severe'] 
-            for result in latest_results
-        )
+        summary = get_dashboard_summary(user)
+        context.update(summary._asdict())
+        context['needs_attention'] = summary.needs_attention
         
         # Resources accessed (currently not tracked, set to 0)
         # TODO: Implement resource tracking system
@@ -505,6 +484,7 @@ class OrganizationDashboardView(LoginRequiredMixin, TemplateView):
             date__gte=thirty_days_ago
         ).order_by('-date')[:50]
         context['recent_moods'] = recent_moods
+        context['mood_risk_users'] = mood_risk.users_needing_attention(limit=5)
         
         # New enhanced features
         # Patient cases
@@ -670,42 +650,7 @@ class OrganizationAnalyticsView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        from screening.models import UserAssessment, AssessmentResult
-        
-        # Get assessment analytics
-        all_assessments = UserAssessment.objects.filter(is_completed=True)
-        
-        # Monthly assessment trends
-        monthly_data = {}
-        for i in range(12):
-            month_start = timezone.now() - timedelta(days=30*i)
-            month_end = timezone.now() - timedelta(days=30*(i-1)) if i > 0 else timezone.now()
-            count = all_assessments.filter(
-                completed_at__gte=month_start,
-                completed_at__lt=month_end
-            ).count()
-            monthly_data[month_start.strftime('%Y-%m')] = count
-        
-        context['monthly_assessments'] = monthly_data
-        
-        # Assessment type distribution
-        assessment_types = {}
-        for assessment in all_assessments:
-            name = assessment.assessment.name
-            assessment_types[name] = assessment_types.get(name, 0) + 1
-        
-        context['assessment_types'] = assessment_types
-        
-        # Severity level distribution
-        severity_levels = {}
-        results = AssessmentResult.objects.filter(
-            user_assessment__is_completed=True
-        )
-        for result in results:
-            level = result.severity_level
-            severity_levels[level] = severity_levels.get(level, 0) + 1
-        
-        context['severity_levels'] = severity_levels
+        context.update(cached_assessment_analytics())
         
         return context
 
@@ -90,6 +90,37 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory in development; set REDIS_URL to share the cache between processes.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'friendofmind',
+        }
+    }
+
+# Keep in-progress assessment answers in the cache and write them once on completion.
+# Only with a shared cache: local memory is per worker and evicts keys once full,
+# so buffered answers could be split across processes or silently lost.
+ASSESSMENT_ANSWER_BUFFERING = bool(REDIS_URL)
+
+# Seconds before the admin dashboards recompute a stale platform stats snapshot on read;
+# run `manage.py refresh_platform_stats` from cron more often than this to keep reads cheap
+PLATFORM_STATS_MAX_AGE = 15 * 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
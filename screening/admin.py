@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Assessment, Question, AnswerChoice, UserAssessment, UserAnswer, AssessmentResult
+from .models import Assessment, Question, AnswerChoice, UserAssessment, UserAnswer, AssessmentResult, SeverityBand
 
 class QuestionInline(admin.TabularInline):
     model = Question
@@ -9,12 +9,16 @@ class AnswerChoiceInline(admin.TabularInline):
     model = AnswerChoice
     extra = 0
 
+class SeverityBandInline(admin.TabularInline):
+    model = SeverityBand
+    extra = 0
+
 @admin.register(Assessment)
 class AssessmentAdmin(admin.ModelAdmin):
     list_display = ['name', 'title', 'is_active', 'created_at']
     list_filter = ['name', 'is_active', 'created_at']
     search_fields = ['title', 'description']
-    inlines = [QuestionInline]
+    inlines = [QuestionInline, SeverityBandInline]
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
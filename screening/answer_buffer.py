@@ -0,0 +1,66 @@
+"""
+Assessment Answer Buffer
+Keeps in-progress answers in the shared cache and writes them once on completion
+"""
+from django.conf import settings
+from django.core.cache import cache
+from .models import UserAnswer
+
+BUFFER_KEY = 'assessment_answers:{id}'
+
+# Long enough to resume an assessment days later, after the session has ended
+BUFFER_TIMEOUT = 30 * 24 * 60 * 60
+
+
+def buffering_enabled():
+    return getattr(settings, 'ASSESSMENT_ANSWER_BUFFERING', False)
+
+
+def load_answers(user_assessment):
+    """
+    Map question id to chosen answer id for an in-progress assessment.
+
+    The buffer is keyed by the UserAssessment rather than the session, so
+    a new login resumes where the user left off. Answers already written
+    as rows (buffering disabled, or an evicted buffer) are read back from
+    the database.
+    """
+    if buffering_enabled():
+        answers = cache.get(BUFFER_KEY.format(id=user_assessment.id))
+        if answers is not None:
+            return answers
+    return dict(UserAnswer.objects.filter(
+        user_assessment=user_assessment
+    ).values_list('question_id', 'answer_choice_id'))
+
+
+def record_answer(user_assessment, answers, question_id, choice_id):
+    """Record one answer in ``answers`` and the buffer, or as a row when buffering is off"""
+    previous = answers.get(question_id)
+    answers[question_id] = choice_id
+
+    if buffering_enabled():
+        cache.set(BUFFER_KEY.format(id=user_assessment.id), answers, BUFFER_TIMEOUT)
+    elif previous is not None:
+        UserAnswer.objects.filter(
+            user_assessment=user_assessment, question_id=question_id
+        ).update(answer_choice_id=choice_id)
+    else:
+        UserAnswer.objects.create(
+            user_assessment=user_assessment, question_id=question_id, answer_choice_id=choice_id
+        )
+
+
+def persist_answers(user_assessment, answers):
+    """Write buffered answers as UserAnswer rows; call inside the completing transaction"""
+    if not buffering_enabled():
+        return
+    UserAnswer.objects.filter(user_assessment=user_assessment).delete()
+    UserAnswer.objects.bulk_create([
+        UserAnswer(user_assessment=user_assessment, question_id=question_id, answer_choice_id=choice_id)
+        for question_id, choice_id in answers.items()
+    ])
+
+
+def clear_answers(user_assessment):
+    cache.delete(BUFFER_KEY.format(id=user_assessment.id))
@@ -0,0 +1,181 @@
+"""
+Assessment Definition Cache
+Immutable question/choice definitions served from process memory and the shared cache
+"""
+import threading
+import time
+import uuid
+from typing import NamedTuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from .models import Assessment, Question, AnswerChoice, SeverityBand
+from .severity import SeverityScale, default_bands
+
+VERSION_KEY = 'assessment_def_version:{id}'
+DEFINITION_KEY = 'assessment_def:{id}:{version}'
+DEFINITION_TIMEOUT = 24 * 60 * 60
+
+# Without a shared cache an edit cannot reach other processes, so their copies expire instead
+LOCAL_DEFINITION_TTL = 60
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+class ChoiceDefinition(NamedTuple):
+    id: int
+    text: str
+    value: int
+    order: int
+
+
+class QuestionDefinition(NamedTuple):
+    id: int
+    text: str
+    order: int
+    choices: tuple
+
+
+class AssessmentDefinition(NamedTuple):
+    id: int
+    name: str
+    title: str
+    version: str
+    questions: tuple
+    severity: SeverityScale
+
+    @property
+    def total_questions(self):
+        return len(self.questions)
+
+    def severity_for(self, score):
+        """Severity level for a total score from the assessment's bands"""
+        return self.severity.level_for(score)
+
+    def question(self, number):
+        """1-based question lookup; None when out of range"""
+        if 1 <= number <= len(self.questions):
+            return self.questions[number - 1]
+        return None
+
+    def choice_for(self, question_id, choice_id):
+        """The choice with ``choice_id`` if it belongs to ``question_id``, else None"""
+        for question in self.questions:
+            if question.id == question_id:
+                for choice in question.choices:
+                    if choice.id == choice_id:
+                        return choice
+        return None
+
+    def first_unanswered(self, answers):
+        """1-based number of the first question missing from ``answers``; None if all answered"""
+        for number, question in enumerate(self.questions, start=1):
+            if question.id not in answers:
+                return number
+        return None
+
+    def choice_values(self):
+        """Map every answer choice id to its score value"""
+        return {
+            choice.id: choice.value
+            for question in self.questions
+            for choice in question.choices
+        }
+
+
+# Definitions loaded by this process: assessment id -> (definition, expires at or None)
+_local_definitions = {}
+_local_lock = threading.Lock()
+
+
+def cache_is_shared():
+    """True when the default cache is visible to every process, so version tokens can signal edits"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def current_version(assessment_id):
+    """Shared version token for an assessment; created on first use"""
+    key = VERSION_KEY.format(id=assessment_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_definition(assessment_id):
+    """Rotate the version so every process reloads the definition on next use"""
+    cache.set(VERSION_KEY.format(id=assessment_id), uuid.uuid4().hex, timeout=None)
+    with _local_lock:
+        _local_definitions.pop(assessment_id, None)
+
+
+def build_definition(assessment_id, version):
+    """Load an assessment, its questions, ordered choices and severity bands with four queries"""
+    assessment = Assessment.objects.get(id=assessment_id)
+    bands = list(SeverityBand.objects.filter(
+        assessment=assessment
+    ).values_list('min_score', 'severity_level'))
+    questions = Question.objects.filter(assessment=assessment).order_by('order', 'id').prefetch_related(
+        Prefetch('choices', queryset=AnswerChoice.objects.order_by('order', 'id'))
+    )
+    return AssessmentDefinition(
+        id=assessment.id,
+        name=assessment.name,
+        title=assessment.title,
+        version=version,
+        questions=tuple(
+            QuestionDefinition(
+                id=question.id,
+                text=question.text,
+                order=question.order,
+                choices=tuple(
+                    ChoiceDefinition(id=c.id, text=c.text, value=c.value, order=c.order)
+                    for c in question.choices.all()
+                ),
+            )
+            for question in questions
+        ),
+        severity=SeverityScale(bands or default_bands(assessment.name)),
+    )
+
+
+def get_definition(assessment):
+    """
+    Return the definition for an Assessment instance or id.
+
+    Reads come from this process first, then the shared cache, and only
+    hit the database when the definition changed or was never loaded.
+    With a shared cache the process copy is checked against the version
+    token on every read; otherwise it is reloaded after
+    ``LOCAL_DEFINITION_TTL`` seconds.
+    """
+    assessment_id = assessment if isinstance(assessment, int) else assessment.id
+    shared = cache_is_shared()
+    version = current_version(assessment_id) if shared else None
+
+    definition, expires_at = _local_definitions.get(assessment_id, (None, None))
+    if definition is not None:
+        if shared and definition.version == version:
+            return definition
+        if not shared and expires_at is not None and expires_at > time.monotonic():
+            return definition
+
+    if shared:
+        shared_key = DEFINITION_KEY.format(id=assessment_id, version=version)
+        definition = cache.get(shared_key)
+        if definition is None:
+            definition = build_definition(assessment_id, version)
+            cache.set(shared_key, definition, DEFINITION_TIMEOUT)
+        expires_at = None
+    else:
+        definition = build_definition(assessment_id, uuid.uuid4().hex)
+        expires_at = time.monotonic() + LOCAL_DEFINITION_TTL
+
+    with _local_lock:
+        # One slot per assessment, so superseded versions are dropped
+        _local_definitions[assessment_id] = (definition, expires_at)
+    return definition
@@ -0,0 +1,109 @@
+"""
+Recompute AssessmentResult severity levels from the current severity bands
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from screening.models import Assessment
+from screening.rescoring import id_slices, init_worker, rescore_slice
+
+
+class Command(BaseCommand):
+    help = 'Re-score or backfill assessment results against the current severity bands'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assessment', help='Assessment id or name (e.g. phq9); all assessments if omitted')
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Attempts read and written per chunk')
+        parser.add_argument('--slice-size', type=int, default=100000,
+                            help='Attempt ids per unit of work; progress is checkpointed per slice')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes re-scoring slices in parallel')
+        parser.add_argument('--checkpoint',
+                            help='JSON file recording the last re-scored attempt id per assessment; '
+                                 'an interrupted run resumes after it')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore and overwrite any existing checkpoint')
+
+    def handle(self, *args, **options):
+        assessments = Assessment.objects.order_by('id')
+        if options['assessment']:
+            value = options['assessment']
+            assessments = assessments.filter(**({'id': int(value)} if value.isdigit() else {'name': value}))
+            if not assessments.exists():
+                raise CommandError(f'Assessment not found: {value}')
+        if options['chunk_size'] < 1 or options['slice_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--chunk-size, --slice-size and --workers must be positive')
+
+        self.checkpoint_path = options['checkpoint']
+        self.last_ids = {} if options['restart'] else self.load_checkpoint()
+        titles = {}
+        tasks = []
+        for assessment in assessments:
+            titles[assessment.id] = assessment.title
+            # Slices start after the last finished id, so added or deleted rows never shift them
+            after_id = self.last_ids.get(str(assessment.id), 0)
+            if after_id:
+                self.stdout.write(f'Resuming {assessment.title} after attempt id {after_id}')
+            for first, last in id_slices(assessment.id, options['slice_size'], after_id):
+                tasks.append((assessment.id, first, last, options['chunk_size']))
+
+        totals = {'examined': 0, 'updated': 0, 'created': 0}
+        started = time.monotonic()
+        for task, stats, elapsed in self.run_tasks(tasks, options['workers']):
+            assessment_id, first, last, _ = task
+            for key in totals:
+                totals[key] += stats[key]
+            # Results arrive in task order, so every id up to ``last`` is done
+            self.last_ids[str(assessment_id)] = last
+            self.save_checkpoint()
+            self.stdout.write(
+                f'{titles[assessment_id]} ids {first}-{last}: {stats["examined"]} examined, '
+                f'{stats["updated"]} updated, {stats["created"]} created '
+                f'({self.rate(stats["examined"], elapsed)} rows/s)'
+            )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{totals["examined"]} examined, {totals["updated"]} updated, {totals["created"]} created '
+            f'in {elapsed:.1f}s ({self.rate(totals["examined"], elapsed)} rows/s)'
+        )
+        self.stdout.write(self.style.SUCCESS('Re-scoring complete.'))
+
+    def run_tasks(self, tasks, workers):
+        if workers == 1 or len(tasks) < 2:
+            for task in tasks:
+                yield rescore_slice(task)
+            return
+        # Forked workers must not share the parent's database sockets
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            yield from pool.map(rescore_slice, tasks)
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path) as f:
+                last_ids = json.load(f)
+        except ValueError:
+            raise CommandError(f'Unreadable checkpoint file: {self.checkpoint_path}')
+        if not isinstance(last_ids, dict) or not all(isinstance(v, int) for v in last_ids.values()):
+            raise CommandError(f'Unreadable checkpoint file: {self.checkpoint_path} (use --restart)')
+        return last_ids
+
+    def save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        # Write then rename so an interrupted run never leaves a truncated checkpoint
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.last_ids, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @staticmethod
+    def rate(rows, elapsed):
+        return f'{rows / elapsed:.0f}' if elapsed > 0 else 'n/a'
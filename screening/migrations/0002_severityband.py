@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Cutoffs previously hard-coded in calculate_severity (screening/views_enhanced.py)
+SEEDED_BANDS = {
+    'phq9': [(0, 'minimal'), (5, 'mild'), (10, 'moderate'), (15, 'moderately_severe'), (20, 'severe')],
+    'gad7': [(0, 'minimal'), (5, 'mild'), (10, 'moderate'), (15, 'severe')],
+    'pss': [(0, 'minimal'), (14, 'mild'), (27, 'moderate'), (41, 'severe')],
+}
+
+
+def seed_bands(apps, schema_editor):
+    Assessment = apps.get_model('screening', 'Assessment')
+    SeverityBand = apps.get_model('screening', 'SeverityBand')
+    SeverityBand.objects.bulk_create([
+        SeverityBand(assessment_id=assessment_id, min_score=min_score, severity_level=level)
+        for assessment_id, name in Assessment.objects.values_list('id', 'name')
+        for min_score, level in SEEDED_BANDS.get(name, [])
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeverityBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_score', models.IntegerField()),
+                ('severity_level', models.CharField(choices=[('minimal', 'Minimal'), ('mild', 'Mild'), ('moderate', 'Moderate'), ('moderately_severe', 'Moderately Severe'), ('severe', 'Severe')], max_length=20)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='severity_bands', to='screening.assessment')),
+            ],
+            options={
+                'ordering': ['assessment', 'min_score'],
+                'unique_together': {('assessment', 'min_score')},
+            },
+        ),
+        migrations.RunPython(seed_bands, migrations.RunPython.noop),
+    ]
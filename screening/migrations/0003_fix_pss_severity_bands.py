@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:10
+
+from django.db import migrations
+
+# 0002 seeded PSS with severe from 41, which a 0-40 scale never reaches
+OLD_PSS_BANDS = [(0, 'minimal'), (14, 'mild'), (27, 'moderate'), (41, 'severe')]
+PSS_BANDS = [(0, 'minimal'), (14, 'moderate'), (27, 'severe')]
+
+
+def replace_bands(apps, old_bands, new_bands):
+    Assessment = apps.get_model('screening', 'Assessment')
+    SeverityBand = apps.get_model('screening', 'SeverityBand')
+    for assessment_id in Assessment.objects.filter(name='pss').values_list('id', flat=True):
+        bands = SeverityBand.objects.filter(assessment_id=assessment_id)
+        # Leave bands an admin has already customised alone
+        if list(bands.order_by('min_score').values_list('min_score', 'severity_level')) != old_bands:
+            continue
+        bands.delete()
+        SeverityBand.objects.bulk_create([
+            SeverityBand(assessment_id=assessment_id, min_score=min_score, severity_level=level)
+            for min_score, level in new_bands
+        ])
+
+
+def fix_pss_bands(apps, schema_editor):
+    replace_bands(apps, OLD_PSS_BANDS, PSS_BANDS)
+
+
+def restore_pss_bands(apps, schema_editor):
+    replace_bands(apps, PSS_BANDS, OLD_PSS_BANDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0002_severityband'),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_pss_bands, restore_pss_bands),
+    ]
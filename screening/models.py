@@ -83,4 +83,17 @@ class AssessmentResult(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
-        return f"{self.user_assessment.user.username} - {self.severity_level}"
\ No newline at end of file
+        return f"{self.user_assessment.user.username} - {self.severity_level}"
+
+class SeverityBand(models.Model):
+    """Lower score bound (inclusive) at which an assessment's severity level starts"""
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='severity_bands')
+    min_score = models.IntegerField()
+    severity_level = models.CharField(max_length=20, choices=AssessmentResult.SEVERITY_LEVELS)
+    
+    class Meta:
+        ordering = ['assessment', 'min_score']
+        unique_together = ['assessment', 'min_score']
+    
+    def __str__(self):
+        return f"{self.assessment.name} - {self.severity_level} from {self.min_score}"
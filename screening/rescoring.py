@@ -0,0 +1,128 @@
+"""
+Severity Re-scoring
+Recomputes AssessmentResult rows from UserAssessment.total_score in chunks after a band change
+"""
+import time
+import numpy as np
+import django
+from django.db import transaction
+from django.db.models import Max, Min
+from core.dashboard_cache import invalidate_dashboards
+from .definitions import get_definition
+from .models import AssessmentResult, UserAssessment
+from .severity import FOLLOW_UP_LEVELS, follow_up_for, recommendation_for
+
+
+def scored_attempts(assessment_id):
+    return UserAssessment.objects.filter(
+        assessment_id=assessment_id, is_completed=True, total_score__isnull=False
+    )
+
+
+def iter_attempt_chunks(assessment_id, chunk_size=5000, after_id=0, until_id=None):
+    """
+    Yield lists of (attempt id, total score, result id, severity level, follow-up) in id order.
+
+    Pages by primary key rather than OFFSET so each chunk is an index
+    range scan no matter how deep into the table it is. Attempts without
+    a result yield ``None`` for the last three columns.
+    """
+    attempts = scored_attempts(assessment_id)
+    if until_id is not None:
+        attempts = attempts.filter(id__lte=until_id)
+    while True:
+        rows = list(attempts.filter(id__gt=after_id).order_by('id').values_list(
+            'id', 'total_score', 'assessmentresult__id', 'assessmentresult__severity_level',
+            'assessmentresult__follow_up_needed',
+        )[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+
+
+def rescore_chunk(scale, rows):
+    """
+    Compare a chunk against the scale in one vectorized lookup.
+
+    Returns ``(to_update, to_create)``: unsaved results whose level or
+    follow-up flag changed and new results for completed attempts that
+    never got one.
+    """
+    attempt_ids, scores, result_ids, current, current_follow_up = (
+        np.asarray(column, dtype=object) for column in zip(*rows)
+    )
+    levels = scale.levels_for(scores.astype(np.int64))
+    follow_up = np.isin(levels, list(FOLLOW_UP_LEVELS))
+    missing = result_ids == None  # noqa: E711 - elementwise comparison
+    changed = ~missing & ((levels != current) | (follow_up != current_follow_up))
+
+    to_update = [
+        AssessmentResult(
+            id=result_id,
+            severity_level=level,
+            recommendation=recommendation_for(level),
+            follow_up_needed=follow_up_for(level),
+        )
+        for result_id, level in zip(result_ids[changed], levels[changed])
+    ]
+    to_create = [
+        AssessmentResult(
+            user_assessment_id=attempt_id,
+            severity_level=level,
+            score_range=str(score),
+            recommendation=recommendation_for(level),
+            follow_up_needed=follow_up_for(level),
+        )
+        for attempt_id, score, level in zip(attempt_ids[missing], scores[missing], levels[missing])
+    ]
+    return to_update, to_create
+
+
+def rescore_results(assessment_id, chunk_size=5000, after_id=0, until_id=None):
+    """
+    Re-score the attempts of an assessment with ids in ``(after_id, until_id]``.
+
+    Each chunk is written in its own transaction, so an interrupted run
+    keeps the chunks already finished. Returns examined/updated/created counts.
+    """
+    scale = get_definition(assessment_id).severity
+    stats = {'examined': 0, 'updated': 0, 'created': 0}
+    for rows in iter_attempt_chunks(assessment_id, chunk_size, after_id, until_id):
+        to_update, to_create = rescore_chunk(scale, rows)
+        with transaction.atomic():
+            AssessmentResult.objects.bulk_update(to_update, ['severity_level', 'recommendation', 'follow_up_needed'])
+            AssessmentResult.objects.bulk_create(to_create)
+        if to_update or to_create:
+            # Bulk writes skip signals; refresh the dashboards of everyone in the chunk
+            invalidate_dashboards(scored_attempts(assessment_id).filter(
+                id__gte=rows[0][0], id__lte=rows[-1][0]
+            ).values_list('user_id', flat=True).distinct())
+        stats['examined'] += len(rows)
+        stats['updated'] += len(to_update)
+        stats['created'] += len(to_create)
+    return stats
+
+
+def id_slices(assessment_id, slice_size, after_id=0):
+    """Split the attempt ids of an assessment above ``after_id`` into inclusive (first, last) slices"""
+    bounds = scored_attempts(assessment_id).filter(id__gt=after_id).aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return []
+    return [
+        (start, min(start + slice_size - 1, bounds['last']))
+        for start in range(bounds['first'], bounds['last'] + 1, slice_size)
+    ]
+
+
+def init_worker():
+    """Process pool initializer; spawned workers need Django configured"""
+    django.setup()
+
+
+def rescore_slice(task):
+    """Process pool entry point: re-score one (assessment_id, first, last, chunk_size) slice"""
+    assessment_id, first, last, chunk_size = task
+    started = time.monotonic()
+    stats = rescore_results(assessment_id, chunk_size, after_id=first - 1, until_id=last)
+    return task, stats, time.monotonic() - started
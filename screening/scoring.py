@@ -0,0 +1,18 @@
+"""
+Assessment Scoring
+Scores attempts in memory from the cached definition
+"""
+
+
+def score_answers(definition, answers):
+    """
+    Total score of ``{question_id: choice_id}`` answers without touching the database.
+
+    Raises ValueError if a choice is not part of the assessment definition.
+    """
+    values = definition.choice_values()
+    try:
+        return sum(values[choice_id] for choice_id in answers.values())
+    except KeyError as e:
+        raise ValueError(f'Answer choice {e.args[0]} is not part of {definition.name}')
+
@@ -0,0 +1,64 @@
+"""
+Severity Scoring
+Table-driven severity lookup over per-assessment score bands
+"""
+from bisect import bisect_right
+import numpy as np
+
+# Bands seeded for the built-in assessments and used when an assessment has none
+DEFAULT_BANDS = {
+    'phq9': [(0, 'minimal'), (5, 'mild'), (10, 'moderate'), (15, 'moderately_severe'), (20, 'severe')],
+    'gad7': [(0, 'minimal'), (5, 'mild'), (10, 'moderate'), (15, 'severe')],
+    # PSS-10 scores run 0-40: low (0-13), moderate (14-26) and high (27-40) stress
+    'pss': [(0, 'minimal'), (14, 'moderate'), (27, 'severe')],
+}
+GENERIC_BANDS = [(0, 'minimal'), (10, 'mild'), (20, 'moderate'), (30, 'severe')]
+
+RECOMMENDATIONS = {
+    'minimal': 'Your scores suggest minimal symptoms. Continue with self-care practices and maintain your mental wellness routine.',
+    'mild': 'Your scores suggest mild symptoms. Consider speaking with a mental health professional and explore our self-help resources.',
+    'moderate': 'Your scores suggest moderate symptoms. We recommend consulting with a mental health professional for further evaluation and support.',
+    'moderately_severe': 'Your scores suggest moderately severe symptoms. Please consider seeking professional help soon. Your symptoms may benefit from treatment.',
+    'severe': 'Your scores suggest severe symptoms. We strongly recommend seeking immediate professional help. Please consider contacting a mental health provider or crisis line.'
+}
+
+
+# Levels whose recommendation is to seek professional help, flagged for follow-up
+FOLLOW_UP_LEVELS = frozenset({'moderately_severe', 'severe'})
+
+
+def default_bands(assessment_name):
+    return DEFAULT_BANDS.get(assessment_name, GENERIC_BANDS)
+
+
+def recommendation_for(severity_level):
+    """Recommendation text for a severity level"""
+    return RECOMMENDATIONS.get(severity_level, 'Please consult with a mental health professional for personalized guidance.')
+
+
+def follow_up_for(severity_level):
+    """Whether a result at this severity level needs follow-up"""
+    return severity_level in FOLLOW_UP_LEVELS
+
+
+class SeverityScale:
+    """
+    Sorted band thresholds for one assessment.
+
+    A score belongs to the band with the greatest threshold not above it;
+    scores below the first threshold fall into the first band.
+    """
+
+    def __init__(self, bands):
+        bands = sorted(bands)
+        self.thresholds = tuple(min_score for min_score, _ in bands)
+        self.levels = tuple(level for _, level in bands)
+
+    def level_for(self, score):
+        """Severity level for one score by binary search"""
+        return self.levels[max(bisect_right(self.thresholds, score) - 1, 0)]
+
+    def levels_for(self, scores):
+        """Severity levels for an array of scores in one vectorized search"""
+        indexes = np.searchsorted(np.asarray(self.thresholds), np.asarray(scores), side='right') - 1
+        return np.asarray(self.levels, dtype=object)[np.maximum(indexes, 0)]
@@ -0,0 +1,45 @@
+"""
+Signal handlers for the screening app
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.dashboard_cache import invalidate_dashboards
+from .definitions import invalidate_definition
+from .models import Assessment, Question, AnswerChoice, SeverityBand, UserAssessment, AssessmentResult
+
+
+@receiver([post_save, post_delete], sender=Assessment)
+def invalidate_assessment_definition(sender, instance, **kwargs):
+    invalidate_definition(instance.id)
+
+
+@receiver([post_save, post_delete], sender=SeverityBand)
+def invalidate_severity_definition(sender, instance, **kwargs):
+    invalidate_definition(instance.assessment_id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question_definition(sender, instance, **kwargs):
+    invalidate_definition(instance.assessment_id)
+
+
+@receiver([post_save, post_delete], sender=AnswerChoice)
+def invalidate_choice_definition(sender, instance, **kwargs):
+    assessment_id = Question.objects.filter(
+        id=instance.question_id
+    ).values_list('assessment_id', flat=True).first()
+    if assessment_id is not None:
+        invalidate_definition(assessment_id)
+
+
+@receiver([post_save, post_delete], sender=UserAssessment)
+def invalidate_attempt_dashboard(sender, instance, **kwargs):
+    invalidate_dashboards([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=AssessmentResult)
+def invalidate_result_dashboard(sender, instance, **kwargs):
+    user_id = UserAssessment.objects.filter(
+        id=instance.user_assessment_id
+    ).values_list('user_id', flat=True).first()
+    invalidate_dashboards([user_id])
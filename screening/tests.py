@@ -1,3 +1,404 @@
-from django.test import TestCase
+from datetime import timedelta
+import json
+import os
+import runpy
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from core.models import User
+from .answer_buffer import load_answers
+from .definitions import LOCAL_DEFINITION_TTL, VERSION_KEY, _local_definitions, get_definition
+from .rescoring import rescore_results
+from .scoring import score_answers
+from .severity import SeverityScale, default_bands, recommendation_for
+from .views import TakeAssessmentView
+from .models import Assessment, Question, AnswerChoice, UserAssessment, UserAnswer, AssessmentResult, SeverityBand
 
-# Create your tests here.
+
+def create_phq9(question_count=9):
+    assessment = Assessment.objects.create(
+        name='phq9', title='PHQ-9', description='Depression screening', instructions='Answer honestly'
+    )
+    for number in range(1, question_count + 1):
+        question = Question.objects.create(assessment=assessment, text=f'Question {number}', order=number)
+        for value, text in enumerate(['Not at all', 'Several days', 'More than half', 'Nearly every day']):
+            AnswerChoice.objects.create(question=question, text=text, value=value, order=value)
+    return assessment
+
+
+def screening_queries(ctx):
+    return [q['sql'] for q in ctx.captured_queries if '"screening_' in q['sql']]
+
+
+class AssessmentDefinitionCacheTests(TestCase):
+    """Question steps read the assessment definition from the cache"""
+
+    def setUp(self):
+        cache.clear()
+        _local_definitions.clear()
+        self.assessment = create_phq9()
+        self.user = User.objects.create(username='taker')
+        self.user_assessment = UserAssessment.objects.create(user=self.user, assessment=self.assessment)
+        self.client.force_login(self.user)
+
+    def question_url(self, number):
+        return reverse('screening:take_assessment_question', args=[self.user_assessment.id, number])
+
+    def test_definition_is_loaded_once(self):
+        get_definition(self.assessment)
+        with self.assertNumQueries(0):
+            definition = get_definition(self.assessment.id)
+        self.assertEqual(definition.total_questions, 9)
+        self.assertEqual([c.value for c in definition.question(1).choices], [0, 1, 2, 3])
+
+    def test_question_step_uses_at_most_two_queries(self):
+        self.client.get(self.question_url(1))
+        for number in (2, 9):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(self.question_url(number))
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(screening_queries(ctx)), 2)
+        self.assertContains(response, 'Nearly every day')
+
+    def test_answers_must_belong_to_the_question(self):
+        definition = get_definition(self.assessment)
+        other_choice = definition.question(2).choices[0]
+        self.client.post(self.question_url(1), {'action': 'next', 'answer': other_choice.id})
+        self.assertEqual(load_answers(self.user_assessment), {})
+
+        choice = definition.question(1).choices[3]
+        self.client.post(self.question_url(1), {'action': 'next', 'answer': choice.id})
+        self.assertEqual(load_answers(self.user_assessment), {definition.question(1).id: choice.id})
+
+    def test_edits_invalidate_the_definition(self):
+        version = get_definition(self.assessment).version
+
+        question = self.assessment.questions.get(order=1)
+        question.text = 'Little interest or pleasure in doing things'
+        question.save()
+        definition = get_definition(self.assessment)
+        self.assertNotEqual(definition.version, version)
+        self.assertEqual(definition.question(1).text, question.text)
+
+        AnswerChoice.objects.filter(question=question, value=3).first().delete()
+        self.assertEqual(len(get_definition(self.assessment).question(1).choices), 3)
+
+    def test_admin_edit_view_invalidates_the_definition(self):
+        get_definition(self.assessment)
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_login(admin)
+        self.client.post(reverse('core:admin_assessment_edit', args=[self.assessment.id]), {
+            'name': 'phq9',
+            'title': 'Patient Health Questionnaire',
+            'description': 'Depression screening',
+            'instructions': 'Answer honestly',
+            'is_active': 'on',
+        })
+        self.assertEqual(get_definition(self.assessment).title, 'Patient Health Questionnaire')
+
+    def test_process_copy_expires_without_a_shared_cache(self):
+        definition = get_definition(self.assessment)
+        # An edit made by another process: nothing here is invalidated
+        Question.objects.filter(assessment=self.assessment, order=1).update(text='Edited elsewhere')
+        self.assertIs(get_definition(self.assessment), definition)
+
+        expired = mock.patch('screening.definitions.time.monotonic', return_value=time.monotonic() + LOCAL_DEFINITION_TTL + 1)
+        with expired:
+            self.assertEqual(get_definition(self.assessment).question(1).text, 'Edited elsewhere')
+        self.assertEqual(list(_local_definitions), [self.assessment.id])
+
+    def test_shared_cache_version_reaches_every_process(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            definition = get_definition(self.assessment)
+            with self.assertNumQueries(0):
+                self.assertIs(get_definition(self.assessment), definition)
+
+            # Another process edits the assessment and rotates the shared version token
+            Question.objects.filter(assessment=self.assessment, order=1).update(text='Edited elsewhere')
+            cache.set(VERSION_KEY.format(id=self.assessment.id), 'rotated', timeout=None)
+            self.assertEqual(get_definition(self.assessment).question(1).text, 'Edited elsewhere')
+            self.assertEqual(list(_local_definitions), [self.assessment.id])
+
+
+@override_settings(ASSESSMENT_ANSWER_BUFFERING=True)
+class AnswerBufferTests(TestCase):
+    """Answers are buffered per assessment and written once on completion"""
+
+    def setUp(self):
+        cache.clear()
+        self.assessment = create_phq9(question_count=3)
+        self.definition = get_definition(self.assessment)
+        self.user = User.objects.create(username='buffered')
+        self.client.force_login(self.user)
+
+    def answer(self, number, value, action='next'):
+        user_assessment = UserAssessment.objects.get(user=self.user)
+        choice = self.definition.question(number).choices[value]
+        return self.client.post(
+            reverse('screening:take_assessment_question', args=[user_assessment.id, number]),
+            {'action': action, 'answer': choice.id},
+        )
+
+    def test_answers_are_written_once_on_completion(self):
+        self.client.get(reverse('screening:start_assessment', args=['phq9']))
+        self.answer(1, 3)
+        self.answer(2, 2)
+        self.assertFalse(UserAnswer.objects.exists())
+
+        # A fresh session resumes at the first unanswered question
+        self.client.logout()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('screening:start_assessment', args=['phq9']))
+        self.assertTrue(response['Location'].endswith('/question/3/'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.answer(3, 1, action='submit')
+        inserts = [sql for sql in screening_queries(ctx) if sql.startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+
+        user_assessment = UserAssessment.objects.get(user=self.user)
+        self.assertTrue(user_assessment.is_completed)
+        self.assertEqual(user_assessment.total_score, 6)
+        self.assertEqual(UserAnswer.objects.count(), 3)
+        self.assertEqual(AssessmentResult.objects.get().severity_level, 'mild')
+
+    def test_submit_requires_every_answer(self):
+        self.client.get(reverse('screening:start_assessment', args=['phq9']))
+        self.answer(1, 1)
+        response = self.answer(3, 1, action='submit')
+        self.assertTrue(response['Location'].endswith('/question/2/'))
+        self.assertFalse(UserAssessment.objects.get(user=self.user).is_completed)
+
+    @override_settings(ASSESSMENT_ANSWER_BUFFERING=False)
+    def test_unbuffered_mode_writes_each_answer(self):
+        self.client.get(reverse('screening:start_assessment', args=['phq9']))
+        self.answer(1, 3)
+        self.answer(1, 2)
+        self.assertEqual(UserAnswer.objects.get().answer_choice.value, 2)
+
+    def test_buffering_follows_the_cache_backend(self):
+        settings_file = os.path.join(settings.BASE_DIR, 'friendofmind', 'settings.py')
+        with mock.patch.dict(os.environ, {'REDIS_URL': 'redis://cache:6379/0'}):
+            shared = runpy.run_path(settings_file)
+        with mock.patch.dict(os.environ):
+            os.environ.pop('REDIS_URL', None)
+            local = runpy.run_path(settings_file)
+
+        self.assertEqual(shared['CACHES']['default']['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+        self.assertTrue(shared['ASSESSMENT_ANSWER_BUFFERING'])
+        self.assertEqual(local['CACHES']['default']['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        self.assertFalse(local['ASSESSMENT_ANSWER_BUFFERING'])
+
+
+class ScoringTests(TestCase):
+    """Scoring cost does not depend on the number of questions"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='scored')
+
+    def complete_enhanced(self, question_count):
+        UserAssessment.objects.all().delete()
+        Assessment.objects.all().delete()
+        definition = get_definition(create_phq9(question_count))
+        self.client.force_login(self.user)
+        self.client.get(reverse('screening:start_assessment', args=['phq9']))
+        user_assessment = UserAssessment.objects.get(user=self.user)
+
+        def post(number, action):
+            url = reverse('screening:take_assessment_question', args=[user_assessment.id, number])
+            self.client.post(url, {'action': action, 'answer': definition.question(number).choices[2].id})
+
+        for number in range(1, question_count):
+            post(number, 'next')
+        with CaptureQueriesContext(connection) as ctx:
+            post(question_count, 'submit')
+        user_assessment.refresh_from_db()
+        self.assertEqual(user_assessment.total_score, 2 * question_count)
+        return len(ctx.captured_queries)
+
+    def complete_legacy(self, question_count):
+        Assessment.objects.all().delete()
+        definition = get_definition(create_phq9(question_count))
+        data = {f'question_{q.id}': q.choices[1].id for q in definition.questions}
+        request = RequestFactory().post('/', data)
+        request.user = self.user
+        request.session = self.client.session
+        request._messages = FallbackStorage(request)
+        with CaptureQueriesContext(connection) as ctx:
+            TakeAssessmentView.as_view()(request, assessment_type='phq9')
+        self.assertEqual(UserAssessment.objects.filter(user=self.user).latest('id').total_score, question_count)
+        return len(ctx.captured_queries)
+
+    def test_enhanced_completion_queries_do_not_grow(self):
+        self.assertEqual(self.complete_enhanced(3), self.complete_enhanced(9))
+
+    def test_legacy_completion_queries_do_not_grow(self):
+        self.assertEqual(self.complete_legacy(3), self.complete_legacy(9))
+        result = AssessmentResult.objects.get(user_assessment__total_score=9)
+        self.assertEqual(result.recommendation, recommendation_for('mild'))
+
+    def test_score_answers_needs_no_queries(self):
+        definition = get_definition(create_phq9(5))
+        answers = {q.id: q.choices[3].id for q in definition.questions}
+        with self.assertNumQueries(0):
+            self.assertEqual(score_answers(definition, answers), 15)
+        self.assertEqual(score_answers(definition, {}), 0)
+        with self.assertRaises(ValueError):
+            score_answers(definition, {1: -1})
+
+
+class SeverityBandTests(TestCase):
+    """Severity comes from per-assessment bands and can be re-scored in bulk"""
+
+    def setUp(self):
+        cache.clear()
+        self.assessment = create_phq9(question_count=2)
+        self.user = User.objects.create(username='banded')
+
+    def test_scale_lookup_matches_vectorized_lookup(self):
+        scale = SeverityScale(default_bands('phq9'))
+        scores = list(range(-1, 28))
+        self.assertEqual([scale.level_for(score) for score in scores], list(scale.levels_for(scores)))
+        self.assertEqual(
+            [scale.level_for(score) for score in (0, 4, 5, 14, 15, 19, 20, 27)],
+            ['minimal', 'minimal', 'mild', 'moderate', 'moderately_severe', 'moderately_severe', 'severe', 'severe'],
+        )
+
+    def test_top_of_every_default_scale_is_severe(self):
+        for name, max_score in (('phq9', 27), ('gad7', 21), ('pss', 40)):
+            self.assertEqual(SeverityScale(default_bands(name)).level_for(max_score), 'severe', name)
+        pss = SeverityScale(default_bands('pss'))
+        self.assertEqual([pss.level_for(score) for score in (13, 14, 26, 27)], ['minimal', 'moderate', 'moderate', 'severe'])
+
+    def test_assessment_without_bands_uses_defaults(self):
+        self.assertEqual(get_definition(self.assessment).severity_for(12), 'moderate')
+
+    def test_band_change_and_bulk_rescore(self):
+        results = []
+        for score in (3, 6, 11):
+            user_assessment = UserAssessment.objects.create(
+                user=self.user, assessment=self.assessment, total_score=score, is_completed=True
+            )
+            level = get_definition(self.assessment).severity_for(score)
+            results.append(AssessmentResult.objects.create(
+                user_assessment=user_assessment, severity_level=level, score_range=str(score), recommendation=''
+            ))
+
+        for min_score, level in [(0, 'minimal'), (5, 'mild'), (10, 'severe')]:
+            SeverityBand.objects.create(assessment=self.assessment, min_score=min_score, severity_level=level)
+
+        stats = rescore_results(self.assessment.id, chunk_size=2)
+        self.assertEqual(stats, {'examined': 3, 'updated': 1, 'created': 0})
+        rows = list(AssessmentResult.objects.order_by('id').values_list('severity_level', 'follow_up_needed'))
+        self.assertEqual(rows, [('minimal', False), ('mild', False), ('severe', True)])
+
+    def test_command_backfills_missing_results_and_resumes(self):
+        attempts = [
+            UserAssessment.objects.create(
+                user=self.user, assessment=self.assessment, total_score=score, is_completed=True
+            )
+            for score in (2, 8, 16, 22)
+        ]
+        UserAssessment.objects.create(user=self.user, assessment=self.assessment)
+        other = Assessment.objects.create(name='gad7', title='GAD-7', description='', instructions='')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, 'rescore.json')
+            with open(checkpoint, 'w') as f:
+                json.dump({str(self.assessment.id): attempts[1].id, str(other.id): 99}, f)
+            # Rows removed before the checkpoint do not shift the remaining slices
+            attempts[0].delete()
+
+            out = StringIO()
+            call_command('rescore_severity', assessment='phq9', chunk_size=1, slice_size=2,
+                         checkpoint=checkpoint, stdout=out)
+            self.assertIn(f'Resuming PHQ-9 after attempt id {attempts[1].id}', out.getvalue())
+            self.assertNotIn('GAD-7', out.getvalue())
+            self.assertIn('rows/s', out.getvalue())
+            results = {
+                attempt_id: (level, follow_up)
+                for attempt_id, level, follow_up in AssessmentResult.objects.values_list(
+                    'user_assessment_id', 'severity_level', 'follow_up_needed'
+                )
+            }
+            self.assertEqual(results, {
+                attempts[2].id: ('moderately_severe', True),
+                attempts[3].id: ('severe', True),
+            })
+
+            with open(checkpoint) as f:
+                self.assertEqual(json.load(f), {str(self.assessment.id): attempts[3].id, str(other.id): 99})
+
+            # Attempts added after a finished run are picked up on the next one
+            added = UserAssessment.objects.create(
+                user=self.user, assessment=self.assessment, total_score=4, is_completed=True
+            )
+            call_command('rescore_severity', assessment='phq9', slice_size=2, checkpoint=checkpoint, stdout=StringIO())
+            self.assertEqual(AssessmentResult.objects.get(user_assessment=added).severity_level, 'minimal')
+
+            call_command('rescore_severity', assessment='phq9', slice_size=2,
+                         checkpoint=checkpoint, restart=True, stdout=StringIO())
+        self.assertEqual(AssessmentResult.objects.count(), 4)
+        self.assertEqual(AssessmentResult.objects.get(user_assessment=attempts[1]).severity_level, 'mild')
+
+
+class AssessmentHistoryTests(TestCase):
+    """The history page loads every completed attempt with one query"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='historian')
+        self.phq9 = create_phq9(question_count=1)
+        self.gad7 = Assessment.objects.create(name='gad7', title='GAD-7', description='', instructions='')
+        self.client.force_login(self.user)
+
+    def complete(self, assessment, score, days_ago):
+        user_assessment = UserAssessment.objects.create(
+            user=self.user, assessment=assessment, total_score=score, is_completed=True,
+            completed_at=timezone.now() - timedelta(days=days_ago),
+        )
+        AssessmentResult.objects.create(
+            user_assessment=user_assessment, severity_level='mild', score_range=str(score), recommendation=''
+        )
+        return user_assessment
+
+    def get_history(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('screening:assessment_history'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_is_constant(self):
+        self.complete(self.phq9, 12, days_ago=3)
+        _, few = self.get_history()
+        for days_ago in range(12):
+            self.complete(self.gad7 if days_ago % 2 else self.phq9, days_ago, days_ago=days_ago + 5)
+        response, many = self.get_history()
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 3)
+        self.assertEqual(response.context['total_completed'], 13)
+        self.assertEqual(len(response.context['assessments']), 10)
+
+    def test_latest_and_trend_per_type(self):
+        self.complete(self.phq9, 15, days_ago=10)
+        latest = self.complete(self.phq9, 9, days_ago=1)
+        self.complete(self.gad7, 4, days_ago=5)
+        self.complete(self.gad7, 8, days_ago=2)
+        response, _ = self.get_history()
+        self.assertEqual(response.context['latest_phq9'], latest)
+        self.assertEqual(response.context['phq9_trend'], 'improving')
+        self.assertEqual(response.context['gad7_trend'], 'stable')
+        self.assertIsNone(response.context['latest_pss'])
+        self.assertNotIn('pss_trend', response.context)
@@ -2,8 +2,14 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView, ListView, DetailView
 from django.contrib import messages
+from django.db import transaction
+from django.http import Http404
 from django.urls import reverse_lazy
-from .models import Assessment, UserAssessment, Question, AnswerChoice, UserAnswer, AssessmentResult
+from django.utils import timezone
+from .models import Assessment, UserAssessment, UserAnswer, AssessmentResult
+from .definitions import get_definition
+from .scoring import score_answers
+from .severity import follow_up_for, recommendation_for
 
 class AssessmentListView(LoginRequiredMixin, ListView):
     model = Assessment
@@ -46,71 +52,47 @@ class TakeAssessmentView(LoginRequiredMixin, TemplateView):
     def post(self, request, *args, **kwargs):
         assessment_type = kwargs.get('assessment_type')
         assessment = get_object_or_404(Assessment, name=assessment_type)
+        definition = get_definition(assessment)
         
-        # Create user assessment
-        user_assessment = UserAssessment.objects.create(
-            user=request.user,
-            assessment=assessment
-        )
-        
-        total_score = 0
-        
-        # Process answers
-        for question in assessment.questions.all():
-            answer_id = request.POST.get(f'question_{question.id}')
+        # Validate answers against the cached definition instead of one query per question
+        answers = {}
+        for question in definition.questions:
+            answer_id = request.POST.get(f'question_{question.id}', '')
             if answer_id:
-                answer_choice = get_object_or_404(AnswerChoice, id=answer_id)
-                UserAnswer.objects.create(
-                    user_assessment=user_assessment,
-                    question=question,
-                    answer_choice=answer_choice
-                )
-                total_score += answer_choice.value
+                answer_choice = definition.choice_for(question.id, int(answer_id)) if answer_id.isdigit() else None
+                if answer_choice is None:
+                    raise Http404('Answer choice not found')
+                answers[question.id] = answer_choice.id
         
-        # Complete assessment
-        user_assessment.total_score = total_score
-        user_assessment.is_completed = True
-        user_assessment.save()
+        total_score = score_answers(definition, answers)
+        severity_level = definition.severity_for(total_score)
         
-        # Create result (simplified logic)
-        severity_level = self.calculate_severity(assessment.name, total_score)
-        AssessmentResult.objects.create(
-            user_assessment=user_assessment,
-            severity_level=severity_level,
-            score_range=f"{total_score}",
-            recommendation=self.get_recommendation(severity_level)
-        )
+        with transaction.atomic():
+            # Create completed user assessment
+            user_assessment = UserAssessment.objects.create(
+                user=request.user,
+                assessment=assessment,
+                total_score=total_score,
+                is_completed=True,
+                completed_at=timezone.now()
+            )
+            
+            UserAnswer.objects.bulk_create([
+                UserAnswer(user_assessment=user_assessment, question_id=question_id, answer_choice_id=choice_id)
+                for question_id, choice_id in answers.items()
+            ])
+            
+            # Create result (simplified logic)
+            AssessmentResult.objects.create(
+                user_assessment=user_assessment,
+                severity_level=severity_level,
+                score_range=f"{total_score}",
+                recommendation=recommendation_for(severity_level),
+                follow_up_needed=follow_up_for(severity_level)
+            )
         
         messages.success(request, 'Assessment completed successfully!')
         return redirect('screening:assessment_result', assessment_id=user_assessment.id)
-    
-    def calculate_severity(self, assessment_name, score):
-        if assessment_name == 'phq9':
-            if score < 5: return 'minimal'
-            elif score < 10: return 'mild'
-            elif score < 15: return 'moderate'
-            elif score < 20: return 'moderately_severe'
-            else: return 'severe'
-        elif assessment_name == 'gad7':
-            if score < 5: return 'minimal'
-            elif score < 10: return 'mild'
-            elif score < 15: return 'moderate'
-            else: return 'severe'
-        else:  # PSS
-            if score < 13: return 'minimal'
-            elif score < 20: return 'mild'
-            elif score < 27: return 'moderate'
-            else: return 'severe'
-    
-    def get_recommendation(self, severity_level):
-        recommendations = {
-            'minimal': 'Your scores suggest minimal symptoms. Continue with self-care practices.',
-            'mild': 'Consider speaking with a mental health professional and explore self-help resources.',
-            'moderate': 'We recommend consulting with a mental health professional for further evaluation.',
-            'moderately_severe': 'Please consider seeking professional help soon. Your symptoms may benefit from treatment.',
-            'severe': 'We strongly recommend seeking immediate professional help. Please consider contacting a mental health provider or crisis line.'
-        }
-        return recommendations.get(severity_level, 'Please consult with a mental health professional.')
 
 class AssessmentResultView(LoginRequiredMixin, DetailView):
     model = UserAssessment
@@ -132,40 +114,30 @@ class AssessmentHistoryView(LoginRequiredMixin, ListView):
         return super().dispatch(request, *args, **kwargs)
     
     def get_queryset(self):
-        return UserAssessment.objects.filter(
-            user=self.request.user, 
-            is_completed=True
-        ).select_related('assessment', 'assessmentresult').order_by('-completed_at')
+        # Fetched once and reused for pagination and the per-type summaries
+        if not hasattr(self, '_completed'):
+            self._completed = list(UserAssessment.objects.filter(
+                user=self.request.user,
+                is_completed=True
+            ).select_related('assessment', 'assessmentresult').order_by('-completed_at'))
+        return self._completed
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        
-        # Assessment type breakdown
-        assessments = self.get_queryset()
-        context['phq9_assessments'] = assessments.filter(assessment__name='phq9')
-        context['gad7_assessments'] = assessments.filter(assessment__name='gad7')
-        context['pss_assessments'] = assessments.filter(assessment__name='pss')
+        completed = self.get_queryset()
+        context['total_completed'] = len(completed)
         
-        # Latest scores by type for trends
-        context['latest_phq9'] = context['phq9_assessments'].first()
-        context['latest_gad7'] = context['gad7_assessments'].first()
-        context['latest_pss'] = context['pss_assessments'].first()
+        # Group by assessment type; each group stays newest first
+        by_type = {}
+        for user_assessment in completed:
+            by_type.setdefault(user_assessment.assessment.name, []).append(user_assessment)
         
-        # Calculate improvement trends (simplified)
-        if context['phq9_assessments'].count() >= 2:
-            latest_phq9 = context['phq9_assessments'][0]
-            previous_phq9 = context['phq9_assessments'][1]
-            context['phq9_trend'] = 'improving' if latest_phq9.total_score < previous_phq9.total_score else 'stable'
-        
-        if context['gad7_assessments'].count() >= 2:
-            latest_gad7 = context['gad7_assessments'][0]
-            previous_gad7 = context['gad7_assessments'][1]
-            context['gad7_trend'] = 'improving' if latest_gad7.total_score < previous_gad7.total_score else 'stable'
-            
-        if context['pss_assessments'].count() >= 2:
-            latest_pss = context['pss_assessments'][0]
-            previous_pss = context['pss_assessments'][1]
-            context['pss_trend'] = 'improving' if latest_pss.total_score < previous_pss.total_score else 'stable'
+        for name in ('phq9', 'gad7', 'pss'):
+            attempts = by_type.get(name, [])
+            context[f'{name}_assessments'] = attempts
+            context[f'latest_{name}'] = attempts[0] if attempts else None
+            if len(attempts) >= 2:
+                latest, previous = attempts[0], attempts[1]
+                context[f'{name}_trend'] = 'improving' if latest.total_score < previous.total_score else 'stable'
         
         return context
\ No newline at end of file
@@ -4,9 +4,15 @@ Enhanced Assessment Views - One Question at a Time with Navigation
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
+from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse
-from .models import Assessment, UserAssessment, Question, AnswerChoice, UserAnswer, AssessmentResult
+from .models import Assessment, UserAssessment, AssessmentResult
+from .definitions import get_definition
+from . import answer_buffer
+from .scoring import score_answers
+from .severity import follow_up_for, recommendation_for
 
 
 @login_required
@@ -35,9 +41,10 @@ def start_assessment(request, assessment_type):
     ).first()
     
     if incomplete:
-        # Continue from where they left off
-        answered_count = UserAnswer.objects.filter(user_assessment=incomplete).count()
-        next_question_number = answered_count + 1
+        # Continue from the first question without an answer
+        definition = get_definition(assessment)
+        answers = answer_buffer.load_answers(incomplete)
+        next_question_number = definition.first_unanswered(answers) or definition.total_questions
         return redirect('screening:take_assessment_question', 
                        assessment_id=incomplete.id, 
                        question_number=next_question_number)
@@ -70,70 +77,56 @@ def take_assessment_question(request, assessment_id, question_number):
         messages.info(request, 'This assessment is already completed.')
         return redirect('screening:assessment_result', assessment_id=user_assessment.id)
     
-    # Get all questions for this assessment (ordered)
-    questions = list(user_assessment.assessment.questions.all().order_by('order'))
-    total_questions = len(questions)
+    # Questions and choices come from the cached definition, not the database
+    definition = get_definition(user_assessment.assessment_id)
+    total_questions = definition.total_questions
+    current_question = definition.question(question_number)
     
     # Validate question number
-    if question_number < 1 or question_number > total_questions:
+    if current_question is None:
         messages.error(request, 'Invalid question number.')
         return redirect('screening:start_assessment', 
-                       assessment_type=user_assessment.assessment.name)
+                       assessment_type=definition.name)
     
-    # Get current question
-    current_question = questions[question_number - 1]
-    
-    # Get existing answer for this question (if any)
-    existing_answer = UserAnswer.objects.filter(
-        user_assessment=user_assessment,
-        question=current_question
-    ).first()
+    # Every answer given so far, from the buffer when answers are buffered
+    answers = answer_buffer.load_answers(user_assessment)
+    selected_choice_id = answers.get(current_question.id)
     
     if request.method == 'POST':
-        print(f"DEBUG: POST received - Action: {request.POST.get('action')}, Answer: {request.POST.get('answer')}")
         action = request.POST.get('action')
         
         if action == 'next' or action == 'submit':
-            # Save answer
-            answer_id = request.POST.get('answer')
+            # Save answer; the choice must belong to the current question
+            answer_id = request.POST.get('answer', '')
+            answer_choice = None
+            if answer_id.isdigit():
+                answer_choice = definition.choice_for(current_question.id, int(answer_id))
             
-            if not answer_id:
-                print(f"DEBUG: No answer selected")
+            if answer_choice is None:
                 messages.error(request, 'Please select an answer.')
                 return redirect('screening:take_assessment_question', 
                                assessment_id=assessment_id, 
                                question_number=question_number)
             
-            answer_choice = get_object_or_404(AnswerChoice, id=answer_id)
-            print(f"DEBUG: Answer choice found: {answer_choice.text}")
-            
-            # Update or create answer
-            if existing_answer:
-                existing_answer.answer_choice = answer_choice
-                existing_answer.save()
-                print(f"DEBUG: Updated existing answer")
-            else:
-                UserAnswer.objects.create(
-                    user_assessment=user_assessment,
-                    question=current_question,
-                    answer_choice=answer_choice
-                )
-                print(f"DEBUG: Created new answer")
+            answer_buffer.record_answer(user_assessment, answers, current_question.id, answer_choice.id)
             
             # Check if this was the last question
             if question_number == total_questions:
-                print(f"DEBUG: Last question - completing assessment")
-                # Complete the assessment
-                return complete_assessment(request, user_assessment)
+                # Every question needs an answer before the assessment can be completed
+                unanswered = definition.first_unanswered(answers)
+                if unanswered:
+                    messages.error(request, 'Please answer every question before submitting.')
+                    return redirect('screening:take_assessment_question', 
+                                   assessment_id=assessment_id, 
+                                   question_number=unanswered)
+                return complete_assessment(request, user_assessment, answers)
             else:
-                print(f"DEBUG: Going to next question: {question_number + 1}")
                 # Go to next question
                 return redirect('screening:take_assessment_question', 
                                assessment_id=assessment_id, 
                                question_number=question_number + 1)
         
         elif action == 'back':
-            print(f"DEBUG: Going back to question: {question_number - 1}")
             # Go to previous question
             if question_number > 1:
                 return redirect('screening:take_assessment_question', 
@@ -141,84 +134,56 @@ def take_assessment_question(request, assessment_id, question_number):
                                question_number=question_number - 1)
     
     # Calculate progress
-    answered_count = UserAnswer.objects.filter(user_assessment=user_assessment).count()
-    progress_percentage = (answered_count / total_questions) * 100
+    progress_percentage = (len(answers) / total_questions) * 100
     
     context = {
         'user_assessment': user_assessment,
-        'assessment': user_assessment.assessment,
+        'assessment': definition,
         'question': current_question,
         'question_number': question_number,
         'total_questions': total_questions,
         'is_first_question': question_number == 1,
         'is_last_question': question_number == total_questions,
         'progress_percentage': round(progress_percentage),
-        'existing_answer': existing_answer,
+        'selected_choice_id': selected_choice_id,
     }
     
     return render(request, 'screening/take_assessment_enhanced.html', context)
 
 
-def complete_assessment(request, user_assessment):
-    """Calculate score and create result"""
-    # Calculate total score
-    answers = UserAnswer.objects.filter(user_assessment=user_assessment)
-    total_score = sum(answer.answer_choice.value for answer in answers)
-    
-    # Update user assessment
-    user_assessment.total_score = total_score
-    user_assessment.is_completed = True
-    user_assessment.save()
-    
-    # Calculate severity and create result
-    severity_level = calculate_severity(user_assessment.assessment.name, total_score)
-    recommendation = get_recommendation(severity_level)
-    
-    AssessmentResult.objects.create(
-        user_assessment=user_assessment,
-        severity_level=severity_level,
-        score_range=f"{total_score}",
-        recommendation=recommendation
-    )
-    
+def complete_assessment(request, user_assessment, answers):
+    """Persist answers, calculate score and create result in a single transaction"""
+    definition = get_definition(user_assessment.assessment_id)
+    
+    with transaction.atomic():
+        # Lock the row so a repeated submit cannot complete it twice
+        user_assessment = UserAssessment.objects.select_for_update().get(id=user_assessment.id)
+        if user_assessment.is_completed:
+            return redirect('screening:assessment_result', assessment_id=user_assessment.id)
+        
+        answer_buffer.persist_answers(user_assessment, answers)
+        
+        # Score in memory from the cached choice values
+        total_score = score_answers(definition, answers)
+        
+        # Update user assessment
+        user_assessment.total_score = total_score
+        user_assessment.is_completed = True
+        user_assessment.completed_at = timezone.now()
+        user_assessment.save()
+        
+        # Severity comes from the assessment's bands
+        severity_level = definition.severity_for(total_score)
+        recommendation = recommendation_for(severity_level)
+        
+        AssessmentResult.objects.create(
+            user_assessment=user_assessment,
+            severity_level=severity_level,
+            score_range=f"{total_score}",
+            recommendation=recommendation,
+            follow_up_needed=follow_up_for(severity_level)
+        )
+    
+    answer_buffer.clear_answers(user_assessment)
     messages.success(request, 'Assessment completed successfully!')
     return redirect('screening:assessment_result', assessment_id=user_assessment.id)
-
-
-def calculate_severity(assessment_name, score):
-    """Calculate severity level based on assessment type and score"""
-    if assessment_name == 'phq9':
-        if score < 5: return 'minimal'
-        elif score < 10: return 'mild'
-        elif score < 15: return 'moderate'
-        elif score < 20: return 'moderately_severe'
-        else: return 'severe'
-    elif assessment_name == 'gad7':
-        if score < 5: return 'minimal'
-        elif score < 10: return 'mild'
-        elif score < 15: return 'moderate'
-        else: return 'severe'
-    elif assessment_name == 'pss':
-        if score < 14: return 'minimal'
-        elif score < 27: return 'mild'
-        elif score < 41: return 'moderate'
-        else: return 'severe'
-    else:
-        # Generic scoring
-        if score < 10: return 'minimal'
-        elif score < 20: return 'mild'
-        elif score < 30: return 'moderate'
-        else: return 'severe'
-
-
-def get_recommendation(severity_level):
-    """Get recommendation text based on severity"""
-    recommendations = {
-        'minimal': 'Your scores suggest minimal symptoms. Continue with self-care practices and maintain your mental wellness routine.',
-        'mild': 'Your scores suggest mild symptoms. Consider speaking with a mental health professional and explore our self-help resources.',
-        'moderate': 'Your scores suggest moderate symptoms. We recommend consulting with a mental health professional for further evaluation and support.',
-        'moderately_severe': 'Your scores suggest moderately severe symptoms. Please consider seeking professional help soon. Your symptoms may benefit from treatment.',
-        'severe': 'Your scores suggest severe symptoms. We strongly recommend seeking immediate professional help. Please consider contacting a mental health provider or crisis line.'
-    }
-    return recommendations.get(severity_level, 'Please consult with a mental health professional for personalized guidance.')
-